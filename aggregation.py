@@ -0,0 +1,313 @@
+"""
+Vectorized time-window aggregation shared by the ETL and the Flask app
+
+Windows are identified by integer floor-division of epoch timestamps, so a
+10-minute window always starts on a 10-minute boundary of the clock.
+All statistics for every column are computed in one pass over the sorted
+rows with `ufunc.reduceat`.
+"""
+import copy
+import numpy as np
+import pandas as pd
+from sketches import add_quantile_columns, window_sketches
+
+DEFAULT_STATS = ("mean", "min", "max", "std")
+AVAILABLE_STATS = ("count", "mean", "min", "max", "std", "sum", "sumsq")
+
+# Mergeable per-window state: rollups over any span are sums/mins/maxes of these
+PARTIAL_STATS = ("count", "sum", "sumsq", "min", "max")
+
+# Statistics computed for every loaded window: the signal values and the partials
+WINDOW_STATS = DEFAULT_STATS + ("count", "sum", "sumsq")
+
+
+def window_ids(timestamps, window_minutes):
+    """
+    Map timestamps to integer window ids (epoch nanoseconds // window length)
+
+    Args:
+        timestamps: Array-like of datetimes
+        window_minutes: Window length in minutes
+
+    Returns:
+        Tuple of (int64 window ids, window length in nanoseconds)
+    """
+    window_ns = int(window_minutes) * 60 * 10**9
+    epoch_ns = np.asarray(timestamps, dtype="datetime64[ns]").astype(np.int64)
+    return epoch_ns // window_ns, window_ns
+
+
+def window_partials(buckets, values):
+    """
+    Reduce rows to mergeable per-window partial state
+
+    Args:
+        buckets: int64 window id of every row
+        values: 2-D float array with one column per series, NaN for missing
+
+    Returns:
+        Tuple of (window ids, count, mean, M2, min, max); every array but the
+        window ids has one row per window and one column per series. M2 is the
+        sum of squared deviations from the window mean; windows without valid
+        values have NaN mean/min/max.
+    """
+    # reduceat needs each window's rows to be contiguous
+    if np.any(buckets[1:] < buckets[:-1]):
+        order = np.argsort(buckets, kind="stable")
+        buckets = buckets[order]
+        values = values[order]
+
+    starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+    keys = buckets[starts]
+
+    valid = ~np.isnan(values)
+    counts = np.add.reduceat(valid, starts, axis=0)
+    sums = np.add.reduceat(np.where(valid, values, 0.0), starts, axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+
+        # Two-pass variance: deviations from each window's own mean
+        sizes = np.diff(np.append(starts, len(buckets)))
+        deviations = np.where(valid, values - np.repeat(means, sizes, axis=0), 0.0)
+        m2 = np.add.reduceat(deviations * deviations, starts, axis=0)
+
+    mins = np.minimum.reduceat(np.where(valid, values, np.inf), starts, axis=0)
+    maxs = np.maximum.reduceat(np.where(valid, values, -np.inf), starts, axis=0)
+    mins = np.where(counts > 0, mins, np.nan)
+    maxs = np.where(counts > 0, maxs, np.nan)
+
+    return keys, counts, means, m2, mins, maxs
+
+
+def aggregate_windows(df, columns, window_minutes=10, stats=DEFAULT_STATS):
+    """
+    Compute per-window statistics for several columns in a single pass
+
+    Every window between the first and the last one is present in the
+    result; windows without rows have a count of 0 and NaN statistics.
+    NaN inputs are ignored, like pandas' resample aggregations.
+
+    Args:
+        df: DataFrame with a `timestamp` column and the value columns
+        columns: Value columns to aggregate
+        window_minutes: Window length in minutes
+        stats: Statistics to compute, any of AVAILABLE_STATS
+            (`std` is the sample standard deviation)
+
+    Returns:
+        DataFrame with `timestamp` (window start) and one `{column}_{stat}`
+        column per column and statistic, ordered by column then statistic
+    """
+    unknown = set(stats) - set(AVAILABLE_STATS)
+    if unknown:
+        raise ValueError(f"Unknown statistics: {', '.join(sorted(unknown))}")
+
+    output_columns = [f"{col}_{stat}" for col in columns for stat in stats]
+    if df.empty:
+        return pd.DataFrame(columns=["timestamp"] + output_columns)
+
+    buckets, window_ns = window_ids(df["timestamp"], window_minutes)
+    values = df[list(columns)].to_numpy(dtype=np.float64)
+    keys, counts, means, m2, mins, maxs = window_partials(buckets, values)
+    results = _window_stats(counts, means, m2, mins, maxs)
+
+    return _windows_frame(keys, keys[0], keys[-1], window_ns, columns, stats, results)
+
+
+def _window_stats(counts, means, m2, mins, maxs):
+    """
+    Derive every statistic of AVAILABLE_STATS from per-window partial state
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sums = np.where(counts > 0, means * counts, 0.0)
+        return {
+            "count": counts,
+            "mean": means,
+            "min": mins,
+            "max": maxs,
+            "std": np.where(counts > 1, np.sqrt(m2 / (counts - 1)), np.nan),
+            "sum": sums,
+            "sumsq": np.where(counts > 0, m2 + sums * means, 0.0),
+        }
+
+
+def _windows_frame(keys, first, last, window_ns, columns, stats, results):
+    """
+    Spread per-window results over every window id in [first, last]
+    """
+    n_windows = int(last - first) + 1
+    positions = keys - first
+    output = {"timestamp": ((first + np.arange(n_windows)) * window_ns).astype("datetime64[ns]")}
+    for i, col in enumerate(columns):
+        for stat in stats:
+            if stat == "count":
+                column = np.zeros(n_windows, dtype=np.int64)
+            else:
+                column = np.full(n_windows, np.nan)
+            column[positions] = results[stat][:, i]
+            output[f"{col}_{stat}"] = column
+
+    return pd.DataFrame(output)
+
+
+class StreamingAggregator:
+    """
+    Incremental window aggregation over micro-batches of rows
+
+    Each open window keeps mergeable partial state (count, mean, M2, min, max)
+    per column. Batches may arrive in any order and overlap windows seen
+    before; partial states are combined with Chan's parallel variance update,
+    so the cost of a batch is proportional to its own size.
+
+    The watermark is the latest timestamp seen minus `allowed_lateness`, or
+    any later time passed to `advance_watermark`. Windows that end at or
+    before the watermark are closed and returned once by `emit_closed`; rows
+    arriving later for an emitted window are dropped and counted in
+    `late_rows`. Emitted windows are forgotten, so a caller that fails to
+    store them rolls back to a `checkpoint` taken before the batch was added.
+
+    With `quantiles`, each open window also keeps a mergeable quantile
+    sketch per column, and emitted windows carry the quantile and sketch
+    columns of `sketches.add_quantile_columns`.
+
+    Args:
+        columns: Value columns to aggregate
+        window_minutes: Window length in minutes
+        allowed_lateness: timedelta subtracted from the latest timestamp seen
+        quantiles: Also sketch the values of every window
+    """
+
+    def __init__(self, columns, window_minutes=10, allowed_lateness=None, quantiles=False):
+        self.columns = list(columns)
+        self.quantiles = quantiles
+        self._sketches = {}
+        self.window_minutes = window_minutes
+        self.window_ns = int(window_minutes) * 60 * 10**9
+        self.lateness_ns = int(pd.Timedelta(allowed_lateness or 0).value)
+        self.watermark = None
+        self.late_rows = 0
+        self._state = {}
+        self._last_emitted = None
+
+    def add(self, df):
+        """
+        Merge a batch of rows with `timestamp` and the value columns
+
+        Returns:
+            Number of rows merged (late rows excluded)
+        """
+        if df.empty:
+            return 0
+
+        buckets, _ = window_ids(df["timestamp"], self.window_minutes)
+        values = df[self.columns].to_numpy(dtype=np.float64)
+
+        if self._last_emitted is not None:
+            on_time = buckets > self._last_emitted
+            self.late_rows += int(np.count_nonzero(~on_time))
+            buckets, values = buckets[on_time], values[on_time]
+            if len(buckets) == 0:
+                return 0
+
+        keys, counts, means, m2, mins, maxs = window_partials(buckets, values)
+        for i, key in enumerate(keys.tolist()):
+            batch = np.stack([counts[i], means[i], m2[i], mins[i], maxs[i]])
+            current = self._state.get(key)
+            self._state[key] = batch if current is None else _merge_partials(current, batch)
+
+        if self.quantiles:
+            for i, col in enumerate(self.columns):
+                for key, sketch in window_sketches(buckets, values[:, i]).items():
+                    current = self._sketches.setdefault(key, {}).get(col)
+                    self._sketches[key][col] = sketch if current is None else current.merge(sketch)
+
+        latest = np.asarray(df["timestamp"].max(), dtype="datetime64[ns]").astype(np.int64)
+        self._advance(int(latest) - self.lateness_ns)
+        return len(buckets)
+
+    def advance_watermark(self, timestamp):
+        """
+        Declare that no rows at or before `timestamp` are still to come
+        """
+        self._advance(int(pd.Timestamp(timestamp).value))
+
+    def _advance(self, watermark_ns):
+        if self.watermark is None or watermark_ns > self.watermark:
+            self.watermark = watermark_ns
+
+    def emit_closed(self, stats=DEFAULT_STATS):
+        """
+        Remove and return every window closed by the watermark
+
+        Args:
+            stats: Statistics to compute, any of AVAILABLE_STATS
+
+        Returns:
+            DataFrame in the layout of `aggregate_windows`; windows without
+            rows between two emitted windows are included with NaN statistics
+        """
+        if self.watermark is None:
+            return aggregate_windows(pd.DataFrame(), self.columns, stats=stats)
+
+        # Windows whose end is at or before the watermark
+        closing = self.watermark // self.window_ns
+        closed = sorted(key for key in self._state if key < closing)
+        if not closed:
+            return aggregate_windows(pd.DataFrame(), self.columns, stats=stats)
+
+        partials = np.stack([self._state.pop(key) for key in closed])
+        results = _window_stats(*(partials[:, i] for i in range(5)))
+        results["count"] = results["count"].astype(np.int64)
+
+        keys = np.array(closed, dtype=np.int64)
+        first = keys[0] if self._last_emitted is None else self._last_emitted + 1
+        self._last_emitted = keys[-1]
+        frame = _windows_frame(keys, first, keys[-1], self.window_ns, self.columns, stats, results)
+
+        if self.quantiles:
+            sketches = [self._sketches.pop(key, {}) for key in closed]
+            for col in self.columns:
+                by_window = {key: window[col] for key, window in zip(closed, sketches) if col in window}
+                add_quantile_columns(frame, col, by_window, self.window_minutes)
+        return frame
+
+    def checkpoint(self):
+        """
+        Snapshot the open windows and the watermark
+
+        Sketches are merged in place, so the snapshot is a deep copy; it only
+        holds the windows still open, not the rows seen.
+        """
+        return copy.deepcopy((self.watermark, self.late_rows, self._last_emitted, self._state, self._sketches))
+
+    def restore(self, checkpoint):
+        """
+        Return to the state of a `checkpoint`, forgetting every row added and
+        every window emitted since it was taken
+        """
+        self.watermark, self.late_rows, self._last_emitted, self._state, self._sketches = checkpoint
+
+    @property
+    def open_windows(self):
+        return len(self._state)
+
+
+def _merge_partials(a, b):
+    """
+    Combine two (count, mean, M2, min, max) partial states of the same window
+    """
+    n_a, mean_a, m2_a, min_a, max_a = a
+    n_b, mean_b, m2_b, min_b, max_b = b
+    n = n_a + n_b
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delta = mean_b - mean_a
+        mean = np.where(n_a == 0, mean_b, np.where(n_b == 0, mean_a, mean_a + delta * n_b / n))
+        m2 = np.where(
+            (n_a == 0) | (n_b == 0),
+            m2_a + m2_b,
+            m2_a + m2_b + delta * delta * n_a * n_b / n,
+        )
+
+    return np.stack([n, mean, m2, np.fmin(min_a, min_b), np.fmax(max_a, max_b)])
@@ -1,13 +1,14 @@
 import logging
 from typing import List, Optional
 from datetime import datetime
-from fastapi import FastAPI, Query, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import FastAPI, Query, HTTPException
+from sqlalchemy import select
 import pandas as pd
-from database import get_db
+import json
+from database import AsyncSessionLocal
 from models import Data
 from fastapi import Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 import os
 
@@ -20,6 +21,69 @@ app = FastAPI(title="Wind Power Data API")
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "api", "templates"))
 
+# Number of rows fetched per round trip when streaming from a server-side cursor
+STREAM_BATCH_SIZE = 1000
+
+DATA_COLUMNS = ["wind_speed", "power", "ambient_temperature"]
+
+
+def data_query(start_date, end_date, value_columns):
+    """
+    Core select over only the requested columns, returning (timestamp, *values) tuples
+    """
+    return select(
+        Data.timestamp,
+        *(getattr(Data, col) for col in value_columns)
+    ).where(
+        Data.timestamp >= start_date,
+        Data.timestamp <= end_date
+    ).order_by(Data.timestamp)
+
+
+def serialize_data_row(row, value_columns):
+    """
+    Convert a (timestamp, *values) tuple into a dictionary
+    """
+    row_dict = {"timestamp": row[0].isoformat()}
+    row_dict.update(zip(value_columns, row[1:]))
+    return row_dict
+
+
+async def stream_ndjson(start_date, end_date, value_columns):
+    """
+    Yield one JSON document per row from a server-side cursor.
+    The session is owned by the generator so it stays open while the body is sent.
+    """
+    async with AsyncSessionLocal() as db:
+        query = data_query(start_date, end_date, value_columns)
+        result = await db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for partition in result.partitions():
+            yield "".join(json.dumps(serialize_data_row(row, value_columns)) + "\n" for row in partition)
+
+
+async def stream_json(start_date, end_date, value_columns):
+    """
+    Yield the JSON document of the range a batch of rows at a time: the data
+    array is written as rows arrive from a server-side cursor, and count
+    follows it once every row has been sent.
+    """
+    count = 0
+    yield '{"data": ['
+    async with AsyncSessionLocal() as db:
+        query = data_query(start_date, end_date, value_columns)
+        result = await db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for partition in result.partitions():
+            chunk = ", ".join(json.dumps(serialize_data_row(row, value_columns)) for row in partition)
+            yield (", " if count else "") + chunk
+            count += len(partition)
+
+    tail = {"count": count}
+    if count:
+        tail.update(start_date=start_date.isoformat(), end_date=end_date.isoformat())
+    else:
+        tail["message"] = "No data found for the specified time range"
+    yield "], " + json.dumps(tail)[1:]
+
 
 @app.get("/health")
 def health_check():
@@ -29,11 +93,11 @@ def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
 @app.get("/data")
-def get_data(
+async def get_data(
     start_date: datetime = Query(..., description="Start date in ISO format"),
     end_date: datetime = Query(..., description="End date in ISO format"),
     columns: Optional[str] = Query(None, description="Comma-separated list of columns to return (wind_speed, power, ambient_temperature)"),
-    db: Session = Depends(get_db)
+    format: str = Query("json", description="Response format (json, ndjson)")
 ):
     """
     Get time series data with filtering capabilities
@@ -47,46 +111,30 @@ def get_data(
         requested_columns = []
         if columns:
             requested_columns = [col.strip() for col in columns.split(',')]
-            valid_columns = ["wind_speed", "power", "ambient_temperature"]
-            if not all(col in valid_columns for col in requested_columns):
-                raise HTTPException(status_code=400, detail=f"Invalid column. Available columns: {', '.join(valid_columns)}")
-        
-        # Query data from database
-        query = db.query(Data).filter(
-            Data.timestamp >= start_date,
-            Data.timestamp <= end_date
-        ).order_by(Data.timestamp)
+            if not all(col in DATA_COLUMNS for col in requested_columns):
+                raise HTTPException(status_code=400, detail=f"Invalid column. Available columns: {', '.join(DATA_COLUMNS)}")
         
-        # Get all data
-        data_rows = query.all()
+        value_columns = [col for col in DATA_COLUMNS if not requested_columns or col in requested_columns]
         
-        if not data_rows:
-            return {"data": [], "count": 0, "message": "No data found for the specified time range"}
+        valid_formats = ["json", "ndjson"]
+        if format not in valid_formats:
+            raise HTTPException(status_code=400, detail=f"Invalid format. Available formats: {', '.join(valid_formats)}")
         
-        # Convert to dictionary format
-        result = []
-        for row in data_rows:
-            row_dict = {
-                "timestamp": row.timestamp.isoformat(),
-            }
-            
-            # Add requested columns or all columns if none specified
-            if not requested_columns or "wind_speed" in requested_columns:
-                row_dict["wind_speed"] = row.wind_speed
-            if not requested_columns or "power" in requested_columns:
-                row_dict["power"] = row.power
-            if not requested_columns or "ambient_temperature" in requested_columns:
-                row_dict["ambient_temperature"] = row.ambient_temperature
-            
-            result.append(row_dict)
+        # Stream rows as newline-delimited JSON without materializing the range
+        if format == "ndjson":
+            return StreamingResponse(
+                stream_ndjson(start_date, end_date, value_columns),
+                media_type="application/x-ndjson"
+            )
         
-        return {
-            "data": result,
-            "count": len(result),
-            "start_date": start_date.isoformat(),
-            "end_date": end_date.isoformat()
-        }
+        # Stream the JSON document as rows arrive instead of building the range in memory
+        return StreamingResponse(
+            stream_json(start_date, end_date, value_columns),
+            media_type="application/json"
+        )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving data: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -0,0 +1,78 @@
+"""
+Benchmark: 10-minute aggregation of one year of 1-minute data
+
+Compares the previous per-column resample + concat implementation with the
+single-pass engine in aggregation.py and checks that both agree.
+
+Usage: python benchmarks/bench_aggregation.py [--repeat N]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from aggregation import aggregate_windows
+
+COLUMNS = ["wind_speed", "power"]
+
+
+def make_year_of_minutes(seed=42):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range("2024-01-01", periods=365 * 24 * 60, freq="1min")
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "wind_speed": np.clip(rng.normal(8, 3, len(timestamps)), 0, 25),
+        "power": np.clip(rng.normal(700, 400, len(timestamps)), 0, 1500),
+    })
+
+
+def legacy_aggregate(df, window_minutes=10):
+    """Previous implementation: one resample per column, then concat"""
+    df = df.set_index("timestamp")
+    rule = f"{window_minutes}min"
+    parts = []
+    for col in COLUMNS:
+        agg = df[col].resample(rule).agg(["mean", "min", "max", "std"])
+        agg.columns = [f"{col}_{stat}" for stat in agg.columns]
+        parts.append(agg)
+    return pd.concat(parts, axis=1).reset_index().fillna(0)
+
+
+def engine_aggregate(df, window_minutes=10):
+    return aggregate_windows(df, COLUMNS, window_minutes=window_minutes).fillna(0)
+
+
+def best_of(func, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    df = make_year_of_minutes()
+    print(f"Rows: {len(df):,}")
+
+    legacy_time, legacy = best_of(legacy_aggregate, df, args.repeat)
+    engine_time, engine = best_of(engine_aggregate, df, args.repeat)
+
+    values = [col for col in legacy.columns if col != "timestamp"]
+    max_error = np.abs(legacy[values].to_numpy() - engine[values].to_numpy()).max()
+
+    print(f"resample + concat : {legacy_time * 1000:8.1f} ms")
+    print(f"single-pass engine: {engine_time * 1000:8.1f} ms")
+    print(f"speedup           : {legacy_time / engine_time:8.1f}x")
+    print(f"windows           : {len(engine):,} (max abs difference {max_error:.2e})")
+
+
+if __name__ == "__main__":
+    main()
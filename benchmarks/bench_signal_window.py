@@ -0,0 +1,148 @@
+"""
+Benchmark: storage size and read latency of signal_window against long signal rows
+
+Loads the same year of 10-minute windows into the previous schema (one row
+per window and signal type, with a JSON copy of the window in every row)
+and into signal_window with its compatibility view, in a scratch schema on
+TARGET_DB_URI that is dropped afterwards. Reports table and index sizes and
+the latency of the /api/signals queries over a day, a month and the year.
+
+Usage: python benchmarks/bench_signal_window.py [--days N] [--repeat N]
+"""
+import io
+import os
+import sys
+import time
+import argparse
+from datetime import timedelta
+import psycopg2
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from materialize import SIGNAL_TYPE_MAPPING, melt_signals
+from loader import load_windows
+from signal_window import WINDOW_COLUMNS, CREATE_WINDOW_TABLE_SQL, CREATE_SIGNAL_VIEW_SQL
+from bench_load import TARGET_DB_URI, make_windows
+
+SCHEMA = "bench_signal_window"
+
+LEGACY_TABLE_SQL = """
+CREATE TABLE signal_legacy (
+    id serial PRIMARY KEY,
+    name varchar(100) NOT NULL,
+    data json,
+    timestamp timestamp NOT NULL,
+    signal_id integer NOT NULL,
+    value double precision NOT NULL
+);
+CREATE UNIQUE INDEX ix_signal_legacy_signal_id_timestamp ON signal_legacy (signal_id, timestamp);
+"""
+
+# Long layout: every signal of the range, ordered for keyset pagination
+LONG_SQL = """
+SELECT id, name, timestamp, value, signal_id, data FROM {relation}
+WHERE timestamp >= %(start)s AND timestamp <= %(end)s
+ORDER BY timestamp, id
+"""
+
+# Wide layout before: pivot the long rows back into one row per window
+LEGACY_WIDE_SQL = f"""
+SELECT timestamp, {", ".join(
+    f"max(CASE WHEN signal_id = {signal_id} THEN value END)" for signal_id in SIGNAL_TYPE_MAPPING.values()
+)}
+FROM signal_legacy
+WHERE timestamp >= %(start)s AND timestamp <= %(end)s
+GROUP BY timestamp ORDER BY timestamp
+"""
+
+WINDOW_WIDE_SQL = f"""
+SELECT timestamp, {", ".join(WINDOW_COLUMNS)}
+FROM signal_window
+WHERE timestamp >= %(start)s AND timestamp <= %(end)s
+ORDER BY timestamp
+"""
+
+SIZE_SQL = """
+SELECT pg_table_size(%(relation)s::regclass), pg_indexes_size(%(relation)s::regclass)
+"""
+
+
+def load_legacy(cursor, df):
+    """Write the long rows of the previous schema with COPY"""
+    signals = melt_signals(df)
+    rows = zip(
+        signals["name"].tolist(),
+        signals["timestamp"].astype("datetime64[us]").astype(str).tolist(),
+        signals["signal_id"].astype(str).tolist(),
+        map(repr, signals["value"].tolist()),
+        signals["data"].tolist(),
+    )
+    buffer = "".join("\t".join(row) + "\n" for row in rows)
+    cursor.copy_expert(
+        "COPY signal_legacy (name, timestamp, signal_id, value, data) FROM STDIN",
+        io.StringIO(buffer)
+    )
+
+
+def timed(cursor, sql, params, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    df = make_windows(args.days)
+    print(f"Windows: {len(df):,} ({len(df) * len(SIGNAL_TYPE_MAPPING):,} signals)")
+
+    connection = psycopg2.connect(TARGET_DB_URI)
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+        cursor.execute(f"SET search_path TO {SCHEMA}")
+        cursor.execute(LEGACY_TABLE_SQL)
+        cursor.execute(CREATE_WINDOW_TABLE_SQL)
+        cursor.execute(CREATE_SIGNAL_VIEW_SQL)
+        load_legacy(cursor, df)
+        load_windows(cursor, df)
+        connection.commit()
+
+        # VACUUM cannot run inside a transaction block
+        connection.autocommit = True
+        cursor.execute("VACUUM ANALYZE signal_legacy")
+        cursor.execute("VACUUM ANALYZE signal_window")
+        connection.autocommit = False
+
+        print(f"\n{'storage':<22}{'table MB':>10}{'index MB':>10}{'total MB':>10}")
+        for relation in ("signal_legacy", "signal_window"):
+            cursor.execute(SIZE_SQL, {"relation": relation})
+            table, index = cursor.fetchone()
+            print(f"{relation:<22}{table / 2**20:>10.1f}{index / 2**20:>10.1f}{(table + index) / 2**20:>10.1f}")
+
+        first = df["timestamp"].iloc[0].to_pydatetime()
+        ranges = [("day", timedelta(days=1)), ("month", timedelta(days=30)), ("year", timedelta(days=args.days))]
+        print(f"\n{'query':<22}{'range':>7}{'rows':>10}{'before ms':>11}{'after ms':>10}")
+        for label, length in ranges:
+            params = {"start": first, "end": first + length - timedelta(microseconds=1)}
+            before, rows = timed(cursor, LONG_SQL.format(relation="signal_legacy"), params, args.repeat)
+            after, _ = timed(cursor, LONG_SQL.format(relation="signal"), params, args.repeat)
+            print(f"{'long (view)':<22}{label:>7}{rows:>10,}{before * 1000:>11.1f}{after * 1000:>10.1f}")
+            before, rows = timed(cursor, LEGACY_WIDE_SQL, params, args.repeat)
+            after, _ = timed(cursor, WINDOW_WIDE_SQL, params, args.repeat)
+            print(f"{'wide':<22}{label:>7}{rows:>10,}{before * 1000:>11.1f}{after * 1000:>10.1f}")
+    finally:
+        connection.rollback()
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        connection.commit()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+In-process result cache for time-range queries
+
+Entries remember the time span they cover so writers can invalidate every
+cached result that overlaps the windows they load.
+"""
+import os
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    LRU cache bounded by total payload size, with a TTL per entry
+
+    Args:
+        max_bytes: Total size of cached payloads before least recently used entries are evicted
+        ttl: Seconds an entry stays valid
+    """
+
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """
+        Return the cached value for a key, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, _, _, size, value = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, start, end, size):
+        """
+        Store a value covering the time span [start, end]
+        """
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.monotonic() + self.ttl, start, end, size, value)
+            self._size += size
+
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_range(self, start, end):
+        """
+        Drop every entry whose time span overlaps [start, end]
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            overlapping = [
+                key for key, (_, entry_start, entry_end, _, _) in self._entries.items()
+                if entry_start <= end and start <= entry_end
+            ]
+            for key in overlapping:
+                self._remove(key)
+            self.invalidations += len(overlapping)
+
+        if overlapping:
+            logger.info(f"Invalidated {len(overlapping)} cached results between {start} and {end}")
+        return len(overlapping)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._size -= entry[3]
+
+    def stats(self):
+        """
+        Return counters describing the cache usage
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+signal_cache = ResultCache(
+    max_bytes=int(os.environ.get("SIGNAL_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl=int(os.environ.get("SIGNAL_CACHE_TTL", "300")),
+)
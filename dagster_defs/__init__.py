@@ -2,6 +2,7 @@
 Dagster definitions for ETL Wind Power Pipeline
 """
 import os
+import sys
 from datetime import datetime, timedelta
 
 from dagster import (
@@ -18,9 +19,16 @@ from dagster import (
     DailyPartitionsDefinition
 )
 
+# etl.transform imports the ETL database module by its bare name; register
+# etl.database under it first so the run shares one module and connection pool
+import etl.database
+sys.modules.setdefault("database", etl.database)
+
 # Import ETL functions
 from etl.transform import fetch_data_from_api, aggregate_data, save_to_target_db
-from etl.database import get_db_session, init_target_db
+from etl.database import get_db_session, init_target_db, pool_stats, target_connection
+from etl.transform import get_source_engine
+from partitions import maintain_partitions
 
 # Get environment variables
 SOURCE_API_URL = os.getenv("SOURCE_API_URL", "http://api:8000")
@@ -98,6 +106,7 @@ def wind_power_signals(context, aggregated_data):
         records_saved = save_to_target_db(aggregated_data)
         
         context.log.info(f"Loaded {records_saved} signals into target database")
+        context.log.info(f"Target DB pool: {pool_stats()}")
         return {"loaded": records_saved, "timestamp": datetime.now().isoformat()}
     finally:
         db_session.close()
@@ -181,9 +190,38 @@ def daily_etl_pipeline_schedule():
     """Schedule for running the ETL pipeline job daily"""
     return {}
 
+@op
+def maintain_target_partitions_op():
+    """Create upcoming monthly partitions of the target database and expire old ones"""
+    with target_connection() as connection:
+        summary = maintain_partitions(connection.cursor())
+        connection.commit()
+    return summary
+
+@op
+def maintain_source_partitions_op():
+    """Create upcoming monthly partitions of the source database and expire old ones"""
+    with get_source_engine().begin() as connection:
+        return maintain_partitions(connection.connection.cursor())
+
+@job
+def partition_maintenance_job():
+    """Monthly partition maintenance of the source and target databases"""
+    maintain_target_partitions_op()
+    maintain_source_partitions_op()
+
+# Run daily so partitions exist well before their month starts, and rows
+# that backfills wrote to the default partitions move out within a day
+partition_maintenance_schedule = ScheduleDefinition(
+    name="daily_partition_maintenance_schedule",
+    job=partition_maintenance_job,
+    cron_schedule="30 0 * * *",  # Run at 00:30 every day
+    description="Schedule for creating and expiring monthly partitions"
+)
+
 # Define Dagster definitions
 defs = Definitions(
     assets=[raw_wind_power_data, aggregated_wind_power_data, wind_power_signals],
-    schedules=[etl_schedule],
-    jobs=[etl_pipeline_job],
+    schedules=[etl_schedule, partition_maintenance_schedule],
+    jobs=[etl_pipeline_job, partition_maintenance_job],
 )
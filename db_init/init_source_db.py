@@ -4,8 +4,12 @@ import sys
 from datetime import datetime, timedelta
 import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, Column, Integer, Float, DateTime, MetaData, Table
+from sqlalchemy import create_engine
 from sqlalchemy import text
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from migrations import migrate, SOURCE_MIGRATIONS
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -111,23 +115,9 @@ def main():
         # Create engine
         engine = create_engine(SOURCE_DB_URI)
         
-        # Create metadata and tables
-        metadata = MetaData()
-        
-        # Define 'data' table
-        data_table = Table(
-            'data', 
-            metadata,
-            Column('id', Integer, primary_key=True),
-            Column('timestamp', DateTime, nullable=False, index=True),
-            Column('wind_speed', Float, nullable=False),
-            Column('power', Float, nullable=False),
-            Column('ambient_temperature', Float, nullable=False)
-        )
-        
-        # Create tables
-        metadata.create_all(engine)
-        logger.info("Source database tables created")
+        # Apply the schema migrations this database has not seen yet
+        applied = migrate(engine, SOURCE_MIGRATIONS)
+        logger.info(f"Source database schema up to date ({len(applied)} migrations applied)")
         
         # Check if table already has data
         with engine.connect() as connection:
@@ -0,0 +1,155 @@
+"""
+Server-side downsampling of time series for chart rendering
+
+Both algorithms keep the first and last points of the range and return the
+indices of the original rows to keep, so every column of a selected row stays
+consistent with the others.
+"""
+import numpy as np
+
+DOWNSAMPLE_METHODS = ["lttb", "minmax"]
+
+
+def _normalize(ys):
+    """
+    Scale each series to [0, 1] so series with different units weigh the same
+    """
+    ys = np.asarray(ys, dtype=np.float64)
+    low = ys.min(axis=1, keepdims=True)
+    span = ys.max(axis=1, keepdims=True) - low
+    span[span == 0] = 1.0
+    return (ys - low) / span
+
+
+def even_indices(n, n_out):
+    """
+    Evenly spaced indices of `n` points, the first and the last included
+
+    Args:
+        n: Number of points
+        n_out: Upper bound on the number of points to keep
+
+    Returns:
+        Sorted array of at most n_out indices
+    """
+    if n_out >= n:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, max(n_out, 1)).round().astype(np.int64))
+
+
+def lttb_indices(x, ys, n_out):
+    """
+    Largest-Triangle-Three-Buckets selection over one or more series
+
+    Triangle areas are summed across the normalized series, so a point that is
+    visually significant for any of them is kept.
+
+    Args:
+        x: 1-D array of increasing x values (e.g. epoch seconds)
+        ys: 2-D array with one row per series
+        n_out: Number of points to keep
+
+    Returns:
+        Sorted array of selected indices
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return even_indices(n, n_out)
+
+    x = np.asarray(x, dtype=np.float64)
+    ys = _normalize(ys)
+
+    # Interior points are split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    sizes = np.diff(edges)
+
+    # Average point of every bucket, used as the third triangle vertex
+    avg_x = np.add.reduceat(x[:-1], edges[:-1]) / sizes
+    avg_y = np.add.reduceat(ys[:, :-1], edges[:-1], axis=1) / sizes
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.concatenate([avg_y[:, 1:], ys[:, -1:]], axis=1)
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], ys[:, a:a + 1]
+        areas = np.abs(
+            (ax - next_x[i]) * (ys[:, lo:hi] - ay)
+            - (ax - x[lo:hi]) * (next_y[:, i:i + 1] - ay)
+        ).sum(axis=0)
+        a = lo + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+
+def minmax_indices(ys, n_out):
+    """
+    Keep the minimum and maximum of every series in each bucket
+
+    Args:
+        ys: 2-D array with one row per series
+        n_out: Upper bound on the number of points to keep
+
+    Returns:
+        Sorted array of selected indices
+    """
+    ys = np.asarray(ys, dtype=np.float64)
+    n = ys.shape[1]
+    if n_out >= n:
+        return np.arange(n)
+
+    # Each bucket contributes up to two points per series besides the first
+    # and last points; below one full bucket, keep evenly spaced points
+    n_buckets = (n_out - 2) // (2 * ys.shape[0])
+    if n_buckets < 1:
+        return even_indices(n, n_out)
+    buckets = np.arange(n) * n_buckets // n
+    starts = np.flatnonzero(np.diff(buckets, prepend=-1))
+    ends = np.append(starts[1:], n) - 1
+
+    selected = [np.array([0, n - 1])]
+    for series in ys:
+        # Sorting by (bucket, value) puts each bucket's min first and max last
+        order = np.lexsort((series, buckets))
+        selected.append(order[starts])
+        selected.append(order[ends])
+
+    return np.unique(np.concatenate(selected))
+
+
+def downsample_rows(rows, columns, max_points, method="lttb"):
+    """
+    Reduce a list of time series rows to at most `max_points` rows
+
+    Args:
+        rows: Core rows ordered by timestamp, with `timestamp` and the value columns
+        columns: Value columns that drive point selection
+        max_points: Maximum number of rows to return
+        method: "lttb" or "minmax"
+
+    Returns:
+        List with the selected rows in their original order
+    """
+    if len(rows) <= max_points:
+        return rows
+
+    # Transpose once and build every array from a whole column
+    fields = list(rows[0]._fields)
+    table = list(zip(*rows))
+    ys = np.array([table[fields.index(col)] for col in columns], dtype=np.float64)
+
+    if method == "minmax":
+        indices = minmax_indices(ys, max_points)
+    else:
+        timestamps = np.array(table[fields.index("timestamp")], dtype="datetime64[us]")
+        x = (timestamps - timestamps[0]).astype(np.float64)
+        indices = lttb_indices(x, ys, max_points)
+
+    return [rows[i] for i in indices]
@@ -1,8 +1,11 @@
 import logging
 import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from transform import process_data_for_date
-from database import init_target_db
+from transform import process_data_for_date, process_increment, StreamingAggregator
+from database import init_target_db, reset_pool, pool_stats
 import sys
 import os
 
@@ -16,19 +19,137 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Seconds between micro-batches in --follow mode
+FOLLOW_INTERVAL = int(os.getenv("ETL_FOLLOW_INTERVAL", "60"))
+
+# Extra attempts for days that failed during a backfill
+BACKFILL_RETRIES = int(os.getenv("ETL_BACKFILL_RETRIES", "2"))
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError("Invalid date format. Please use YYYY-MM-DD")
+
+def follow():
+    """
+    Run the ETL continuously, fetching only the rows written since the
+    previous micro-batch and loading each 10-minute window once it closes
+    """
+    aggregator = StreamingAggregator(["wind_speed", "power"], window_minutes=10, quantiles=True)
+    
+    # Start at the beginning of the window in progress so it is aggregated from its first row
+    now = datetime.now()
+    start = now.replace(minute=now.minute - now.minute % 10, second=0, microsecond=0)
+    
+    logger.info(f"Following source data from {start} every {FOLLOW_INTERVAL}s")
+    while True:
+        end = datetime.now()
+        try:
+            result = process_increment(aggregator, start, end)
+            logger.info(f"Micro-batch {start} - {end}: {result['processed']} records processed, {result['loaded']} records loaded")
+            
+            # The API range is inclusive on both ends
+            start = end + timedelta(microseconds=1)
+        except Exception as e:
+            # The aggregator is rolled back, so the range is fetched again with the next one
+            logger.error(f"Error processing micro-batch {start} - {end}: {str(e)}")
+        
+        time.sleep(FOLLOW_INTERVAL)
+
+def backfill(start_date, end_date, workers, retries=BACKFILL_RETRIES):
+    """
+    Process every day in [start_date, end_date] on a pool of worker processes
+    
+    Days that fail are retried, up to `retries` more times, without
+    re-running the days that succeeded.
+    
+    Args:
+        start_date: First day to process
+        end_date: Last day to process
+        workers: Maximum number of days processed at the same time
+        retries: Extra attempts for failed days
+    
+    Returns:
+        List with the final result of every day, ordered by date
+    """
+    pending = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    results = {}
+    started = time.monotonic()
+    
+    logger.info(f"Backfilling {len(pending)} days from {start_date} to {end_date} with {workers} workers")
+    for attempt in range(1, retries + 2):
+        failed = []
+        # Workers are forked after init_target_db and open their own pooled connections
+        with ProcessPoolExecutor(max_workers=workers, initializer=reset_pool) as executor:
+            futures = {executor.submit(process_data_for_date, day): day for day in pending}
+            for future in as_completed(futures):
+                day = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"processed": 0, "loaded": 0, "date": day.isoformat(), "error": str(e)}
+                
+                results[day] = result
+                if "error" in result:
+                    failed.append(day)
+                    logger.warning(f"{day}: failed on attempt {attempt}: {result['error']}")
+                else:
+                    logger.info(f"{day}: {result['processed']} records processed, {result['loaded']} records loaded")
+        
+        if not failed:
+            break
+        pending = sorted(failed)
+        if attempt <= retries:
+            logger.info(f"Retrying {len(pending)} failed days")
+    
+    elapsed = time.monotonic() - started
+    processed = sum(result["processed"] for result in results.values())
+    loaded = sum(result["loaded"] for result in results.values())
+    failed = sorted(day for day, result in results.items() if "error" in result)
+    checkouts = sum(result.get("pool_checkouts", 0) for result in results.values())
+    pool_wait = sum(result.get("pool_wait", 0.0) for result in results.values())
+    
+    logger.info(
+        f"Backfill completed in {elapsed:.1f}s: {len(results) - len(failed)}/{len(results)} days, "
+        f"{processed} records processed ({processed / elapsed if elapsed else 0:.0f} rows/s), {loaded} records loaded"
+    )
+    logger.info(f"Target DB pool: {checkouts} checkouts, {pool_wait:.3f}s waiting for a connection")
+    if failed:
+        logger.error(f"Failed days: {', '.join(day.isoformat() for day in failed)}")
+    
+    return [results[day] for day in sorted(results)]
+
 def main():
-    # Initialize target database if needed
+    parser = argparse.ArgumentParser(description="Aggregate source data into 10-minute signals")
+    parser.add_argument("date", nargs="?", type=parse_date, help="Day to process (YYYY-MM-DD), yesterday by default")
+    parser.add_argument("--follow", action="store_true", help="Process new data continuously in micro-batches")
+    parser.add_argument("--start", type=parse_date, help="First day of a backfill (YYYY-MM-DD)")
+    parser.add_argument("--end", type=parse_date, help="Last day of a backfill (YYYY-MM-DD), --start by default")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Days processed in parallel during a backfill")
+    args = parser.parse_args()
+    
+    if args.end and not args.start:
+        parser.error("--end requires --start")
+    if args.start and args.end and args.end < args.start:
+        parser.error("--end must not be before --start")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    
+    # Initialize target database once, before any worker starts
     init_target_db()
     
-    # Get date to process from command line argument or use yesterday
-    if len(sys.argv) > 1:
-        try:
-            process_date = datetime.strptime(sys.argv[1], "%Y-%m-%d").date()
-        except ValueError:
-            logger.error("Invalid date format. Please use YYYY-MM-DD")
+    if args.follow:
+        follow()
+    
+    if args.start:
+        results = backfill(args.start, args.end or args.start, args.workers)
+        if any("error" in result for result in results):
             sys.exit(1)
-    else:
-        process_date = (datetime.now() - timedelta(days=1)).date()
+        return results
+    
+    # Process the given date or yesterday
+    process_date = args.date or (datetime.now() - timedelta(days=1)).date()
     
     logger.info(f"Processing data for date: {process_date}")
     
@@ -36,6 +157,7 @@ def main():
     result = process_data_for_date(process_date)
     
     logger.info(f"ETL process completed: {result['processed']} records processed, {result['loaded']} records loaded")
+    logger.info(f"Target DB pool: {pool_stats()}")
     
     return result
 
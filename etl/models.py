@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, LargeBinary, Index
 from sqlalchemy.orm import relationship 
 from extensions import db
 import sys
@@ -29,6 +29,9 @@ class Signal(db.Model):
     """
     __tablename__ = "signal"
 
+    # One row per signal type and window; loads merge on this key
+    __table_args__ = (Index("ix_signal_signal_id_timestamp", "signal_id", "timestamp", unique=True),)
+
     id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
     data = Column(JSON, nullable=True)
@@ -50,8 +53,11 @@ class Data(db.Model):
     """
     __tablename__ = "data"
 
+    # Whole days of this append-only table are scanned by block range, see migrations.py
+    __table_args__ = (Index("ix_data_timestamp_brin", "timestamp", postgresql_using="brin"),)
+
     id = Column(Integer, primary_key=True)
-    timestamp = Column(DateTime, nullable=False, index=True)
+    timestamp = Column(DateTime, nullable=False)
     wind_speed = Column(Float, nullable=False)
     power = Column(Float, nullable=False)
     ambient_temperature = Column(Float, nullable=False)
@@ -59,6 +65,32 @@ class Data(db.Model):
     def __repr__(self):
         return f"<Data(id={self.id}, timestamp={self.timestamp})>"
 
+class SignalWindow(db.Model):
+    """
+    Every statistic of one 10-minute window in one row of float8 columns;
+    on Postgres the signal table is a view over it
+    """
+    __tablename__ = "signal_window"
+
+    timestamp = Column(DateTime, primary_key=True)
+    wind_speed_mean = Column(Float)
+    wind_speed_min = Column(Float)
+    wind_speed_max = Column(Float)
+    wind_speed_std = Column(Float)
+    power_mean = Column(Float)
+    power_min = Column(Float)
+    power_max = Column(Float)
+    power_std = Column(Float)
+    wind_speed_p5 = Column(Float)
+    wind_speed_p50 = Column(Float)
+    wind_speed_p95 = Column(Float)
+    power_p5 = Column(Float)
+    power_p50 = Column(Float)
+    power_p95 = Column(Float)
+
+    def __repr__(self):
+        return f"<SignalWindow(timestamp={self.timestamp})>"
+
 class SignalData(db.Model):
     """
     Optional model for storing key-value metadata for signals
@@ -74,3 +106,50 @@ class SignalData(db.Model):
 
     def __repr__(self):
         return f"<SignalData(id={self.id}, signal_id={self.signal_id}, key={self.key}, value={self.value})>"
+
+class PartialAggregateMixin:
+    """
+    Mergeable statistics of one series over one time bucket
+    """
+    series = Column(String(50), primary_key=True)
+    timestamp = Column(DateTime, primary_key=True)
+    count = Column(Integer, nullable=False)
+    sum = Column(Float, nullable=False)
+    sumsq = Column(Float, nullable=False)
+    min = Column(Float, nullable=False)
+    max = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}(series={self.series}, timestamp={self.timestamp}, count={self.count})>"
+
+class SignalPartial(PartialAggregateMixin, db.Model):
+    """
+    Partial aggregates of every loaded 10-minute window
+    """
+    __tablename__ = "signal_partial_10m"
+
+class SignalRollupHourly(PartialAggregateMixin, db.Model):
+    """
+    Hourly rollup merged from the 10-minute partials
+    """
+    __tablename__ = "signal_rollup_1h"
+
+class SignalRollupDaily(PartialAggregateMixin, db.Model):
+    """
+    Daily rollup merged from the hourly rollup
+    """
+    __tablename__ = "signal_rollup_1d"
+
+class SignalSketch(db.Model):
+    """
+    Serialized quantile sketch of one series over one 10m, 1h or 1d bucket
+    """
+    __tablename__ = "signal_sketch"
+
+    series = Column(String(50), primary_key=True)
+    bucket = Column(String(3), primary_key=True)
+    timestamp = Column(DateTime, primary_key=True)
+    sketch = Column(LargeBinary, nullable=False)
+
+    def __repr__(self):
+        return f"<SignalSketch(series={self.series}, bucket={self.bucket}, timestamp={self.timestamp})>"
@@ -9,8 +9,8 @@ from dagster import asset, op, job, schedule, AssetIn, In, Out, daily_partitione
 from dagster.utils import file_relative_path
 import pandas as pd
 
-from transform import fetch_data_from_api, aggregate_data
-from database import get_db_session, init_target_db
+from transform import fetch_data_from_api, aggregate_data, fetch_aggregated_from_db, ETL_EXTRACT_MODE
+from database import init_target_db
 from models import Signal
 
 # Define resources for database connections
@@ -35,6 +35,14 @@ def source_data(context):
     start_datetime = datetime.combine(partition_date, datetime.min.time())
     end_datetime = datetime.combine(partition_date, datetime.max.time())
     
+    if ETL_EXTRACT_MODE == "pushdown":
+        # The source database returns the 10-minute windows directly
+        df, processed = fetch_aggregated_from_db(start_datetime, end_datetime, window_minutes=10)
+        df.attrs["aggregated"] = True
+        
+        context.log.info(f"Aggregated {processed} records into {len(df)} windows in the source database for date {partition_date_str}")
+        return df
+    
     # Fetch data from API
     df = fetch_data_from_api(
         start_datetime, 
@@ -54,6 +62,10 @@ def aggregated_data(context, source_data):
         context.log.warning("No source data available to aggregate")
         return pd.DataFrame()
     
+    # Already aggregated by the source database in pushdown mode
+    if source_data.attrs.get("aggregated"):
+        return source_data
+    
     # Aggregate in 10-minute windows
     agg_df = aggregate_data(source_data, window_minutes=10)
     
@@ -70,16 +82,12 @@ def transformed_signals(context, aggregated_data):
         context.log.warning("No aggregated data available to load")
         return {"loaded": 0}
     
-    # Save to target database
-    db_session = get_db_session()
-    try:
-        from transform import save_to_target_db
-        records_saved = save_to_target_db(aggregated_data, db_session)
-        
-        context.log.info(f"Loaded {records_saved} signals into target database")
-        return {"loaded": records_saved}
-    finally:
-        db_session.close()
+    # Save to target database over a pooled connection
+    from transform import save_to_target_db
+    records_saved = save_to_target_db(aggregated_data)
+    
+    context.log.info(f"Loaded {records_saved} signals into target database")
+    return {"loaded": records_saved}
 
 # Define a job that processes data for a specific day
 @job
@@ -6,9 +6,16 @@ import random
 import numpy as np
 import pandas as pd
 from sqlalchemy import create_engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker
 from main import db
-from models import Data, SignalType, Signal
+from models import Data, SignalType, Signal, SignalWindow
+from cache import signal_cache
+from aggregation import aggregate_windows, WINDOW_STATS
+from rollups import store_partials, store_sketches
+from sketches import add_window_quantiles
+from materialize import melt_signals, signal_records
+from loader import load_windows, window_columns
 
 # Configure logging
 logging.basicConfig(
@@ -144,68 +151,59 @@ def process_etl_data(days=1):
                 })
             
             df = pd.DataFrame(df_data)
-            df = df.set_index('timestamp')
             
-            # Resample to 10-minute windows
-            rule = '10T'
+            # Aggregate both columns into 10-minute windows in one pass,
+            # with the partials the hourly and daily rollups are merged from
+            result = aggregate_windows(df, ["wind_speed", "power"], window_minutes=10, stats=WINDOW_STATS)
             
-            # Calculate aggregations for wind_speed
-            wind_speed_agg = df["wind_speed"].resample(rule).agg(["mean", "min", "max", "std"])
-            wind_speed_agg.columns = [f"wind_speed_{col}" for col in wind_speed_agg.columns]
-            
-            # Calculate aggregations for power
-            power_agg = df["power"].resample(rule).agg(["mean", "min", "max", "std"])
-            power_agg.columns = [f"power_{col}" for col in power_agg.columns]
-            
-            # Combine aggregated data
-            result = pd.concat([wind_speed_agg, power_agg], axis=1)
-            
-            # Reset index to make timestamp a column again
-            result = result.reset_index()
+            # Quantile sketch of every window, with its p5/p50/p95
+            result = add_window_quantiles(result, df, ["wind_speed", "power"], window_minutes=10)
             
             # Fill NaN values (can happen if a window has no data)
             result = result.fillna(0)
             
-            # Define mapping of DataFrame columns to signal types
-            signal_type_mapping = {
-                "wind_speed_mean": 1,  # wind_speed_avg
-                "wind_speed_min": 2,   # wind_speed_min
-                "wind_speed_max": 3,   # wind_speed_max
-                "wind_speed_std": 4,   # wind_speed_std
-                "power_mean": 5,       # power_avg
-                "power_min": 6,        # power_min
-                "power_max": 7,        # power_max
-                "power_std": 8,        # power_std
-            }
-            
-            signals_to_add = []
-            
-            # Iterate through DataFrame rows
-            for _, row in result.iterrows():
-                timestamp = row["timestamp"]
+            # One signal per window and stored statistic
+            n_records = len(result) * len(window_columns(result))
+            
+            # Merge windows on their timestamp, so reprocessing a day replaces them
+            if n_records:
+                # COPY staging and rollup SQL rely on Postgres upserts and date_trunc
+                if db.engine.dialect.name == "postgresql":
+                    cursor = db.session.connection().connection.cursor()
+                    load_windows(cursor, result)
+                    store_partials(cursor, result, ["wind_speed", "power"])
+                    store_sketches(cursor, result, ["wind_speed", "power"])
+                else:
+                    # SQLite has no compatibility view: write the windows and the long signal rows
+                    columns = window_columns(result)
+                    upsert = sqlite_insert(SignalWindow.__table__)
+                    db.session.execute(
+                        upsert.on_conflict_do_update(
+                            index_elements=["timestamp"],
+                            set_={column: upsert.excluded[column] for column in columns}
+                        ),
+                        result[["timestamp"] + columns].to_dict(orient="records")
+                    )
+                    
+                    upsert = sqlite_insert(Signal.__table__)
+                    db.session.execute(
+                        upsert.on_conflict_do_update(
+                            index_elements=["signal_id", "timestamp"],
+                            set_={column: upsert.excluded[column] for column in ("name", "value", "data")}
+                        ),
+                        [
+                            {"name": name, "timestamp": timestamp, "signal_id": signal_id, "value": value, "data": data}
+                            for name, timestamp, signal_id, value, data in signal_records(melt_signals(result, data_as_json=False))
+                        ]
+                    )
                 
-                # Create data JSON object with all values from the row
-                data_json = {col: float(row[col]) for col in result.columns if col != "timestamp"}
-                
-                # Create a signal record for each metric
-                for column, signal_type_id in signal_type_mapping.items():
-                    if column in row:
-                        signal = Signal(
-                            name=column,
-                            timestamp=timestamp,
-                            signal_id=signal_type_id,
-                            value=float(row[column]),
-                            data=data_json
-                        )
-                        signals_to_add.append(signal)
-            
-            # Bulk insert records
-            if signals_to_add:
-                db.session.add_all(signals_to_add)
                 db.session.commit()
                 
-                logger.info(f"Successfully saved {len(signals_to_add)} signal records")
-                return len(signals_to_add)
+                # Cached /api/signals results overlapping these windows are now stale
+                signal_cache.invalidate_range(result["timestamp"].min(), result["timestamp"].max())
+                
+                logger.info(f"Successfully saved {n_records} signal records")
+                return n_records
             
             return 0
             
@@ -0,0 +1,172 @@
+"""
+Idempotent loading of aggregated windows into the target database
+
+A window is identified by its timestamp and stored as one signal_window row
+(see signal_window.py). Rows are streamed to a temporary stage table with
+COPY, from an in-memory text buffer built from the aggregated arrays, and
+merged into signal_window with a single INSERT ... ON CONFLICT DO UPDATE, so
+reloading a window replaces its values instead of adding duplicate rows, and
+the table grows with the number of distinct windows rather than with the
+number of ETL runs.
+
+Writers pass a DB-API cursor of a Postgres connection so the merge commits
+together with the partials and rollups of the same windows, which are
+staged the same way with `stage_rows`.
+"""
+import io
+import logging
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from signal_window import WINDOW_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Rows written per COPY statement, bounding the size of the text buffer
+COPY_CHUNK_ROWS = 100_000
+
+# Rows are deduplicated before staging, so every staged window is unique
+CREATE_STAGE_SQL = """
+CREATE TEMPORARY TABLE IF NOT EXISTS signal_window_stage (LIKE signal_window) ON COMMIT DROP
+"""
+
+STAGE_WINDOWS_SQL = """
+COPY signal_window_stage (timestamp, {columns}) FROM STDIN
+"""
+
+# Only the statistics present in the frame are written; unchanged rows are
+# left alone so reloading a window does not rewrite it
+MERGE_WINDOWS_SQL = """
+INSERT INTO signal_window (timestamp, {columns})
+SELECT timestamp, {columns}
+FROM signal_window_stage
+ON CONFLICT (timestamp) DO UPDATE SET
+    {assignments}
+WHERE ({current}) IS DISTINCT FROM ({excluded})
+"""
+
+CLEAR_STAGE_SQL = "TRUNCATE signal_window_stage"
+
+# Stage tables of the other tables written with every load, see stage_rows
+CREATE_TABLE_STAGE_SQL = """
+CREATE TEMPORARY TABLE IF NOT EXISTS {stage} (LIKE {table}) ON COMMIT DROP
+"""
+
+STAGE_ROWS_SQL = """
+COPY {stage} ({columns}) FROM STDIN
+"""
+
+
+def window_columns(df):
+    """
+    Return the signal_window columns an aggregated frame provides
+    """
+    return [column for column in WINDOW_COLUMNS if column in df.columns]
+
+
+def copy_buffer(timestamps, values):
+    """
+    Write windows in COPY text format
+
+    Args:
+        timestamps: datetime64 array of window starts
+        values: 2-D float array with one row per window and one column per statistic
+
+    Returns:
+        StringIO positioned at the start of the buffer
+    """
+    columns = [np.datetime_as_string(timestamps, unit="us").tolist()]
+    # repr round-trips every float8 exactly; missing statistics become NULL
+    columns += [
+        ["\\N" if value != value else repr(value) for value in column.tolist()]
+        for column in values.T
+    ]
+
+    buffer = io.StringIO()
+    buffer.writelines(line + "\n" for line in map("\t".join, zip(*columns)))
+    buffer.seek(0)
+    return buffer
+
+
+def copy_value(value):
+    """
+    Format one value in COPY text format
+    """
+    if value is None or (isinstance(value, float) and value != value):
+        return "\\N"
+    if isinstance(value, (bytes, memoryview)):
+        # bytea hex input, with the backslash escaped for the text format
+        return "\\\\x" + bytes(value).hex()
+    if isinstance(value, float):
+        return repr(float(value))
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def stage_rows(cursor, table, columns, rows):
+    """
+    COPY rows into an empty temporary stage table shaped like `table`, to
+    be merged into it with one INSERT ... SELECT
+
+    Args:
+        cursor: psycopg2 cursor of the target database, inside the load transaction
+        table: Table the stage table is created like
+        columns: Columns to write
+        rows: Dicts with a value for every column
+
+    Returns:
+        Name of the stage table, dropped on commit
+    """
+    stage = f"{table}_stage"
+    cursor.execute(CREATE_TABLE_STAGE_SQL.format(stage=stage, table=table))
+    cursor.execute(f"TRUNCATE {stage}")
+
+    buffer = io.StringIO()
+    buffer.writelines("\t".join(copy_value(row[column]) for column in columns) + "\n" for row in rows)
+    buffer.seek(0)
+    cursor.copy_expert(STAGE_ROWS_SQL.format(stage=stage, columns=", ".join(columns)), buffer)
+    return stage
+
+
+def load_windows(cursor, df, chunk_rows=COPY_CHUNK_ROWS):
+    """
+    COPY aggregated windows into the stage table and merge them into signal_window
+
+    Args:
+        cursor: psycopg2 cursor of the target database, inside the load transaction
+        df: Aggregated frame with `timestamp` and the signal_window columns;
+            the last row of a repeated timestamp wins
+        chunk_rows: Rows per COPY statement
+
+    Returns:
+        Number of windows inserted or changed
+    """
+    columns = window_columns(df)
+    if df.empty or not columns:
+        return 0
+
+    timestamps = pd.to_datetime(df["timestamp"])
+    unique = ~timestamps.duplicated(keep="last").to_numpy()
+    timestamps = timestamps.to_numpy(dtype="datetime64[us]")[unique]
+    values = df[columns].to_numpy(dtype=np.float64)[unique]
+
+    names = ", ".join(columns)
+    cursor.execute(CREATE_STAGE_SQL)
+    for start in range(0, len(timestamps), chunk_rows):
+        stop = start + chunk_rows
+        cursor.copy_expert(
+            STAGE_WINDOWS_SQL.format(columns=names),
+            copy_buffer(timestamps[start:stop], values[start:stop])
+        )
+    cursor.execute(MERGE_WINDOWS_SQL.format(
+        columns=names,
+        assignments=",\n    ".join(f"{column} = EXCLUDED.{column}" for column in columns),
+        current=", ".join(f"signal_window.{column}" for column in columns),
+        excluded=", ".join(f"EXCLUDED.{column}" for column in columns),
+    ))
+    merged = cursor.rowcount
+    cursor.execute(CLEAR_STAGE_SQL)
+
+    logger.debug(f"Merged {len(timestamps)} windows through COPY, {merged} inserted or changed")
+    return merged
@@ -1,20 +1,479 @@
 import os
+import io
+import base64
+import hashlib
+import hmac
 import logging
-from flask import Flask, render_template, jsonify, request
+import json
+import pyarrow as pa
+import pyarrow.parquet as pq
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context, after_this_request
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.orm import DeclarativeBase
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone, date, time
 from flask import Flask, request, jsonify, render_template, current_app
 from extensions import db
+from registry import signal_types
+from cache import signal_cache
+from downsample import DOWNSAMPLE_METHODS, downsample_rows
+from rollups import ROLLUP_TIERS, partial_stats, signal_stat
+from sketches import QUANTILES, QuantileSketch
+from migrations import migrate
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Number of rows fetched per round trip when streaming from a server-side cursor
+STREAM_BATCH_SIZE = 1000
+
+# Media types available through content negotiation
+JSON_MIMETYPE = "application/json"
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MIMETYPE = "application/x-parquet"
+
+# Upper bound for the `limit` pagination parameter
+MAX_PAGE_SIZE = 50000
+
+# Signal timestamps are the starts of 10-minute windows
+SIGNAL_WINDOW = timedelta(minutes=10)
+
+# Shared secret ETL writers send in X-Cache-Token to invalidate cached results;
+# invalidation is refused while it is unset
+CACHE_INVALIDATE_TOKEN = os.environ.get("CACHE_INVALIDATE_TOKEN", "")
+
+# Seconds shared caches may keep responses for ranges that ended before today
+HISTORICAL_CACHE_MAX_AGE = int(os.environ.get("HISTORICAL_CACHE_MAX_AGE", "3600"))
+
+DATA_COLUMNS = ["wind_speed", "power", "ambient_temperature"]
+
+SIGNAL_ARROW_SCHEMA = pa.schema([
+    pa.field("id", pa.int64(), nullable=False),
+    pa.field("name", pa.string(), nullable=False),
+    pa.field("timestamp", pa.timestamp("us"), nullable=False),
+    pa.field("value", pa.float64(), nullable=False),
+    pa.field("signal_type", pa.string(), nullable=False),
+    pa.field("data", pa.string()),
+])
+
+ROLLUP_ARROW_SCHEMA = pa.schema([
+    pa.field("name", pa.string(), nullable=False),
+    pa.field("timestamp", pa.timestamp("us"), nullable=False),
+    pa.field("value", pa.float64(), nullable=False),
+    pa.field("signal_type", pa.string(), nullable=False),
+])
+
 # Create base class for SQLAlchemy models
 class Base(DeclarativeBase):
     pass
 
+def data_value_columns(requested_columns):
+    """
+    Value columns to return, in table order; all of them if none were requested
+    """
+    return [col for col in DATA_COLUMNS if not requested_columns or col in requested_columns]
+
+def serialize_data_row(row, value_columns):
+    """
+    Convert an (id, timestamp, *values) tuple into a dictionary
+    """
+    row_dict = {"timestamp": row[1].isoformat()}
+    row_dict.update(zip(value_columns, row[2:]))
+    return row_dict
+
+def stream_ndjson(rows, value_columns):
+    """
+    Yield one JSON document per row. Pass a result executed with `yield_per`
+    to read from a server-side cursor so memory stays flat regardless of range length
+    """
+    for row in rows:
+        yield json.dumps(serialize_data_row(row, value_columns)) + "\n"
+
+def execute_streaming(query):
+    """
+    Execute a Core select through a server-side cursor, fetching
+    STREAM_BATCH_SIZE rows per round trip
+    """
+    return db.session.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+
+def encode_cursor(timestamp, row_id):
+    """
+    Encode the (timestamp, id) keyset position of a row as an opaque cursor
+    """
+    payload = json.dumps([timestamp.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    """
+    Decode an opaque cursor back into its (timestamp, id) keyset position
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def parse_page_args():
+    """
+    Read the `limit` and `cursor` query parameters
+
+    Returns:
+        Tuple of (limit or None, (timestamp, id) position or None)
+    """
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    return limit, decode_cursor(cursor) if cursor else None
+
+def split_page(rows, limit):
+    """
+    Split up to `limit + 1` rows ordered by (timestamp, id) into one keyset page
+
+    Returns:
+        Tuple of (rows, cursor of the next page or None on the last page)
+    """
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].timestamp, rows[-1].id)
+
+def negotiate_columnar_format():
+    """
+    Return the columnar media type requested in the Accept header, or None for JSON
+    """
+    best = request.accept_mimetypes.best_match(
+        [JSON_MIMETYPE, ARROW_MIMETYPE, PARQUET_MIMETYPE],
+        default=JSON_MIMETYPE
+    )
+    return None if best == JSON_MIMETYPE else best
+
+def data_arrow_schema(value_columns):
+    """
+    Build the Arrow schema for /api/data with the given value columns
+    """
+    fields = [pa.field("timestamp", pa.timestamp("us"), nullable=False)]
+    fields += [pa.field(col, pa.float64(), nullable=False) for col in value_columns]
+    return pa.schema(fields)
+
+def _to_record_batch(rows, schema):
+    columns = zip(*rows)
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema
+    )
+
+def record_batches(rows, schema):
+    """
+    Group an iterable of value tuples, ordered like the schema fields,
+    into typed Arrow record batches of STREAM_BATCH_SIZE rows
+    """
+    buffer = []
+    for row in rows:
+        buffer.append(row)
+        if len(buffer) == STREAM_BATCH_SIZE:
+            yield _to_record_batch(buffer, schema)
+            buffer = []
+    if buffer:
+        yield _to_record_batch(buffer, schema)
+
+def stream_arrow(batches, schema):
+    """
+    Serialize record batches in the Arrow IPC stream format, yielding bytes
+    as soon as each batch is written
+    """
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            chunk = sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+            yield chunk
+    yield sink.getvalue()
+
+def columnar_response(batches, schema, mimetype):
+    """
+    Build an Arrow IPC stream or Parquet response from record batches
+    """
+    if mimetype == PARQUET_MIMETYPE:
+        # Parquet needs the whole table to write its footer
+        buffer = io.BytesIO()
+        pq.write_table(pa.Table.from_batches(list(batches), schema=schema), buffer)
+        return Response(buffer.getvalue(), mimetype=mimetype)
+
+    return Response(stream_with_context(stream_arrow(batches, schema)), mimetype=mimetype)
+
+def range_validators(model, start_date, end_date, *criteria, page=None):
+    """
+    Compute cheap validators for a time range from one aggregate query:
+    row count and max id (for tables that have one) change when rows are
+    added or removed, and the value sum (or the partial sums of rollup
+    tables) changes when rows are rewritten
+
+    A keyset page (limit, after) only aggregates the rows of that page plus
+    the one that decides its next cursor, so paging through a range stays
+    linear instead of re-reading the whole range for every page
+
+    Returns:
+        Tuple of (etag, timestamp of the latest row or None)
+    """
+    columns = [model.timestamp]
+    if hasattr(model, "id"):
+        columns.append(model.id)
+    columns.extend(getattr(model, column) for column in ("value", "count", "sum") if hasattr(model, column))
+
+    rows = select(*columns).where(
+        model.timestamp >= start_date,
+        model.timestamp <= end_date,
+        *criteria
+    )
+    limit, after = page or (None, None)
+    if after:
+        rows = rows.where(tuple_(model.timestamp, model.id) > after)
+    if limit:
+        rows = rows.order_by(model.timestamp, model.id).limit(limit + 1)
+    rows = rows.subquery()
+
+    aggregates = [func.count(), func.max(rows.c.timestamp)]
+    aggregates.extend(
+        func.max(column) if column.name == "id" else func.sum(column)
+        for column in list(rows.c)[1:]
+    )
+    state = db.session.execute(select(*aggregates).select_from(rows)).one()
+
+    # The same range in another representation must not share the validator
+    representation = (
+        request.path,
+        sorted(request.args.items(multi=True)),
+        negotiate_columnar_format(),
+    )
+    etag = hashlib.sha1(repr((representation, tuple(state))).encode()).hexdigest()
+    return etag, state[1]
+
+def conditional_range(model, start_date, end_date, *criteria, page=None):
+    """
+    Answer a conditional GET for a time range before any row is read
+
+    Returns a (response, etag) pair: the response is a 304 when the client
+    already holds the current version of the range. Otherwise it is None and
+    the ETag, Last-Modified and Cache-Control headers are registered on the
+    response the view is about to build; the ETag identifies the version of
+    the range, so callers can key cached results on it.
+
+    Last-Modified is the timestamp of the latest row, which moves as new
+    windows arrive but not when old rows are rewritten, so If-Modified-Since
+    is only consulted when the client sent no If-None-Match
+    """
+    etag, latest = range_validators(model, start_date, end_date, *criteria, page=page)
+    last_modified = latest.replace(microsecond=0, tzinfo=timezone.utc) if latest else None
+
+    # Ranges that ended before today only change on backfills
+    today = datetime.combine(date.today(), time.min)
+    if end_date < today:
+        cache_control = f"public, max-age={HISTORICAL_CACHE_MAX_AGE}"
+    else:
+        cache_control = "no-cache"
+
+    def add_validator(response):
+        response.set_etag(etag)
+        if last_modified:
+            response.last_modified = last_modified
+        response.headers["Cache-Control"] = cache_control
+        response.vary.add("Accept")
+        return response
+
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+    else:
+        not_modified = (
+            last_modified is not None
+            and request.if_modified_since is not None
+            and last_modified <= request.if_modified_since
+        )
+    if not_modified:
+        return add_validator(Response(status=304)), etag
+
+    @after_this_request
+    def add_validator_on_success(response):
+        if response.status_code == 200:
+            add_validator(response)
+        return response
+
+    return None, etag
+
+def snap_to_windows(start_date, end_date, window=SIGNAL_WINDOW):
+    """
+    Shrink a range to the window starts it contains. Signal timestamps are
+    window starts, so the snapped range selects exactly the same rows and
+    equivalent ranges (e.g. two "last 24h" requests a few seconds apart)
+    normalize to the same key
+    """
+    start_offset = start_date - datetime.min
+    end_offset = end_date - datetime.min
+    start = datetime.min + -(-start_offset // window) * window
+    end = datetime.min + (end_offset // window) * window
+    return start, end
+
+def cached_range(cache, key, start_date, end_date):
+    """
+    Serve a time-range response from a ResultCache
+
+    Returns the cached response on a hit. Otherwise returns None and registers
+    the response the view is about to build to be stored under the key,
+    covering [start_date, end_date] for invalidation.
+    """
+    cached = cache.get(key)
+    if cached is not None:
+        body, mimetype, headers = cached
+        return Response(body, mimetype=mimetype, headers=headers)
+
+    @after_this_request
+    def store_result(response):
+        # Streamed bodies are never buffered just to be cached
+        if response.status_code == 200 and not response.is_streamed:
+            body = response.get_data()
+            next_cursor = response.headers.get("X-Next-Cursor")
+            headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+            cache.set(key, (body, response.mimetype, headers), start_date, end_date, size=len(body))
+        return response
+
+    return None
+
+def wide_signals_response(columns, start_date, end_date):
+    """
+    Build the layout=wide response of /api/signals: one record per window
+    with one typed column per signal type
+
+    Args:
+        columns: List of (signal_id, name) pairs to pivot into columns
+    """
+    from queries import signal_wide_query
+
+    query = signal_wide_query(columns, start_date, end_date)
+    names = [name for _, name in columns]
+
+    # Typed columnar batches for clients that ask for Arrow or Parquet
+    columnar_mimetype = negotiate_columnar_format()
+    if columnar_mimetype:
+        schema = pa.schema(
+            [pa.field("timestamp", pa.timestamp("us"), nullable=False)]
+            + [pa.field(name, pa.float64()) for name in names]
+        )
+        return columnar_response(record_batches(execute_streaming(query), schema), schema, columnar_mimetype)
+
+    rows = db.session.execute(query).all()
+    if not rows:
+        return jsonify({
+            "data": [],
+            "count": 0,
+            "message": "No signals found for the specified criteria"
+        })
+
+    result = []
+    for row in rows:
+        row_dict = {"timestamp": row[0].isoformat()}
+        row_dict.update(zip(names, row[1:]))
+        result.append(row_dict)
+
+    return jsonify({
+        "data": result,
+        "count": len(result),
+        "layout": "wide",
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat()
+    })
+
+def rollup_signals_response(model, bucket, columns, start_date, end_date, layout):
+    """
+    Build /api/signals responses for bucket=1h|1d from a rollup tier
+
+    Args:
+        model: Partial aggregate model of the tier
+        bucket: Tier name, used to select its quantile sketches
+        columns: List of (signal_type name, series, statistic) to answer
+        layout: "long" for one record per signal, "wide" for one per bucket
+    """
+    from models import SignalSketch
+    from queries import rollup_query, sketch_query
+
+    series_names = sorted({series for _, series, _ in columns})
+    query = rollup_query(model, series_names, start_date, end_date)
+
+    # Merge each bucket's partials back into the statistics per series
+    buckets = {}
+    for series, timestamp, count, total, sumsq, minimum, maximum in db.session.execute(query):
+        buckets.setdefault(timestamp, {})[series] = partial_stats(count, total, sumsq, minimum, maximum)
+
+    # Percentiles come from the merged sketches of the same tier
+    quantile_stats = {stat for _, _, stat in columns if stat in QUANTILES}
+    if quantile_stats:
+        query = sketch_query(SignalSketch, bucket, series_names, start_date, end_date)
+        for series, timestamp, blob in db.session.execute(query):
+            sketch = QuantileSketch.from_bytes(blob)
+            stats = buckets.setdefault(timestamp, {}).setdefault(series, {})
+            stats.update({stat: sketch.quantile(QUANTILES[stat]) for stat in quantile_stats})
+
+    names = [name for name, _, _ in columns]
+    if layout == "wide":
+        rows = [
+            (timestamp, *(stats.get(series, {}).get(stat) for _, series, stat in columns))
+            for timestamp, stats in sorted(buckets.items())
+        ]
+        schema = pa.schema(
+            [pa.field("timestamp", pa.timestamp("us"), nullable=False)]
+            + [pa.field(name, pa.float64()) for name in names]
+        )
+    else:
+        rows = [
+            (f"{series}_{stat}", timestamp, stats[series][stat], name)
+            for timestamp, stats in sorted(buckets.items())
+            for name, series, stat in columns
+            if stats.get(series, {}).get(stat) is not None
+        ]
+        schema = ROLLUP_ARROW_SCHEMA
+
+    # Typed columnar batches for clients that ask for Arrow or Parquet
+    columnar_mimetype = negotiate_columnar_format()
+    if columnar_mimetype:
+        return columnar_response(record_batches(rows, schema), schema, columnar_mimetype)
+
+    if not rows:
+        return jsonify({
+            "data": [],
+            "count": 0,
+            "message": "No signals found for the specified criteria"
+        })
+
+    if layout == "wide":
+        result = [
+            dict(zip(["timestamp"] + names, [row[0].isoformat(), *row[1:]]))
+            for row in rows
+        ]
+    else:
+        result = [
+            {"name": name, "timestamp": timestamp.isoformat(), "value": value, "signal_type": signal_type}
+            for name, timestamp, value, signal_type in rows
+        ]
+
+    return jsonify({
+        "data": result,
+        "count": len(result),
+        "layout": layout,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat()
+    })
+
 def create_app():
     app = Flask(__name__, template_folder='templates')
     from models import SignalType
@@ -31,23 +490,17 @@ def create_app():
     db.init_app(app)
 
     with app.app_context():
-        db.create_all()
-        if not db.session.query(SignalType).first():
-            default_signal_types = [
-                SignalType(id=1, name="wind_speed_avg"),
-                SignalType(id=2, name="wind_speed_min"),
-                SignalType(id=3, name="wind_speed_max"),
-                SignalType(id=4, name="wind_speed_std"),
-                SignalType(id=5, name="power_avg"),
-                SignalType(id=6, name="power_min"),
-                SignalType(id=7, name="power_max"),
-                SignalType(id=8, name="power_std"),
-            ]
-            db.session.add_all(default_signal_types)
-            db.session.commit()
-            logger.info("Default signal types initialized")
+        # Bring the schema and the default signal types up to date before anything reads them
+        migrate(db.engine)
+
+    # Resolve signal type ids and names in memory for every request
+    signal_types.init_app(app)
 
     from models import Data, Signal, SignalType
+    from models import SignalPartial, SignalRollupHourly, SignalRollupDaily, SignalSketch
+
+    # Tables answering /api/signals for each bucket other than the raw 10-minute signals
+    rollup_models = {"1h": SignalRollupHourly, "1d": SignalRollupDaily}
 
     @app.route('/')
     def index():
@@ -75,6 +528,9 @@ def create_app():
             start_date_str = request.args.get('start_date')
             end_date_str = request.args.get('end_date')
             columns = request.args.get('columns')
+            output_format = request.args.get('format', 'json')
+            max_points = request.args.get('max_points')
+            downsample_method = request.args.get('downsample', 'lttb')
             
             # Default to last 24 hours if no dates provided
             if not start_date_str:
@@ -101,14 +557,95 @@ def create_app():
                         "error": f"Invalid column. Available columns: {', '.join(valid_columns)}"
                     }), 400
             
-            # Query data from database
-            query = Data.query.filter(
+            valid_formats = ["json", "ndjson"]
+            if output_format not in valid_formats:
+                return jsonify({
+                    "error": f"Invalid format. Available formats: {', '.join(valid_formats)}"
+                }), 400
+            
+            try:
+                limit, after = parse_page_args()
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            
+            # Validate downsampling parameters
+            if max_points is not None:
+                if not max_points.isdigit() or not 3 <= int(max_points) <= MAX_PAGE_SIZE:
+                    return jsonify({
+                        "error": f"max_points must be an integer between 3 and {MAX_PAGE_SIZE}"
+                    }), 400
+                if limit or after:
+                    return jsonify({
+                        "error": "max_points cannot be combined with limit or cursor"
+                    }), 400
+                max_points = int(max_points)
+            
+            if downsample_method not in DOWNSAMPLE_METHODS:
+                return jsonify({
+                    "error": f"Invalid downsample method. Available methods: {', '.join(DOWNSAMPLE_METHODS)}"
+                }), 400
+            
+            # Answer conditional requests before reading any row
+            not_modified, _ = conditional_range(Data, start_date, end_date, page=(limit, after))
+            if not_modified:
+                return not_modified
+            
+            # Select only the requested columns; rows come back as plain tuples
+            # of (id, timestamp, *values) without ORM hydration
+            value_columns = data_value_columns(requested_columns)
+            query = select(
+                Data.id,
+                Data.timestamp,
+                *(getattr(Data, col) for col in value_columns)
+            ).where(
                 Data.timestamp >= start_date,
                 Data.timestamp <= end_date
-            ).order_by(Data.timestamp)
+            )
+            
+            # Seek past the last row of the previous page, never OFFSET
+            if after:
+                query = query.where(tuple_(Data.timestamp, Data.id) > after)
+            
+            query = query.order_by(Data.timestamp, Data.id)
+            
+            # Fetch a bounded page when a limit is given
+            if limit:
+                data_rows, next_cursor = split_page(db.session.execute(query.limit(limit + 1)).all(), limit)
+            else:
+                data_rows, next_cursor = None, None
+            headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+            
+            # Size the payload to the chart instead of the range
+            if max_points:
+                data_rows = downsample_rows(
+                    db.session.execute(query).all(),
+                    value_columns,
+                    max_points,
+                    method=downsample_method
+                )
+            
+            # Stream rows as newline-delimited JSON without materializing the range
+            if output_format == "ndjson":
+                rows = data_rows if data_rows is not None else execute_streaming(query)
+                return Response(
+                    stream_with_context(stream_ndjson(rows, value_columns)),
+                    mimetype="application/x-ndjson",
+                    headers=headers
+                )
+            
+            # Typed columnar batches for clients that ask for Arrow or Parquet
+            columnar_mimetype = negotiate_columnar_format()
+            if columnar_mimetype:
+                schema = data_arrow_schema(value_columns)
+                rows = data_rows if data_rows is not None else execute_streaming(query)
+                values = (row[1:] for row in rows)
+                response = columnar_response(record_batches(values, schema), schema, columnar_mimetype)
+                response.headers.update(headers)
+                return response
             
             # Get all data
-            data_rows = query.all()
+            if data_rows is None:
+                data_rows = db.session.execute(query).all()
             
             if not data_rows:
                 return jsonify({
@@ -118,27 +655,14 @@ def create_app():
                 })
             
             # Convert to dictionary format
-            result = []
-            for row in data_rows:
-                row_dict = {
-                    "timestamp": row.timestamp.isoformat(),
-                }
-                
-                # Add requested columns or all columns if none specified
-                if not requested_columns or "wind_speed" in requested_columns:
-                    row_dict["wind_speed"] = row.wind_speed
-                if not requested_columns or "power" in requested_columns:
-                    row_dict["power"] = row.power
-                if not requested_columns or "ambient_temperature" in requested_columns:
-                    row_dict["ambient_temperature"] = row.ambient_temperature
-                
-                result.append(row_dict)
+            result = [serialize_data_row(row, value_columns) for row in data_rows]
             
             return jsonify({
                 "data": result,
                 "count": len(result),
                 "start_date": start_date.isoformat(),
-                "end_date": end_date.isoformat()
+                "end_date": end_date.isoformat(),
+                "next_cursor": next_cursor
             })
         
         except Exception as e:
@@ -157,6 +681,8 @@ def create_app():
             start_date_str = request.args.get('start_date')
             end_date_str = request.args.get('end_date')
             signal_type = request.args.get('signal_type')
+            layout = request.args.get('layout', 'long')
+            bucket = request.args.get('bucket', '10m')
             
             # Default to last 24 hours if no dates provided
             if not start_date_str:
@@ -167,6 +693,91 @@ def create_app():
                 start_date = datetime.fromisoformat(start_date_str)
                 end_date = datetime.fromisoformat(end_date_str) if end_date_str else datetime.now()
             
+            if bucket not in ROLLUP_TIERS:
+                return jsonify({
+                    "error": f"Invalid bucket. Available buckets: {', '.join(ROLLUP_TIERS)}"
+                }), 400
+            
+            bucket_length = ROLLUP_TIERS[bucket][1]
+            start_date, end_date = snap_to_windows(start_date, end_date, bucket_length)
+            
+            try:
+                limit, after = parse_page_args()
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            
+            valid_layouts = ["long", "wide"]
+            if layout not in valid_layouts:
+                return jsonify({
+                    "error": f"Invalid layout. Available layouts: {', '.join(valid_layouts)}"
+                }), 400
+            
+            if layout == "wide" and (limit or after):
+                return jsonify({
+                    "error": "layout=wide cannot be combined with limit or cursor"
+                }), 400
+            
+            if bucket in rollup_models and (limit or after):
+                return jsonify({
+                    "error": f"bucket={bucket} cannot be combined with limit or cursor"
+                }), 400
+            
+            # Get signal type ID by name
+            signal_type_id = None
+            if signal_type:
+                signal_type_id = signal_types.id_for(signal_type)
+                if signal_type_id is None:
+                    return jsonify({
+                        "error": "Invalid signal type"
+                    }), 400
+            
+            # Hourly and daily buckets are read from the rollup tiers
+            if bucket in rollup_models:
+                types = [(signal_type_id, signal_type)] if signal_type else signal_types.items()
+                columns = [(name, *signal_stat(name)) for _, name in types if signal_stat(name)]
+                if not columns:
+                    return jsonify({
+                        "error": f"Signal type is not available for bucket={bucket}"
+                    }), 400
+                
+                model = rollup_models[bucket]
+                not_modified, etag = conditional_range(
+                    model, start_date, end_date, model.series.in_({series for _, series, _ in columns})
+                )
+                if not_modified:
+                    return not_modified
+                
+                # Keyed on the version of the range, so rows written through another
+                # process are never served from a stale entry; a bucket also
+                # covers the windows after its start
+                cache_key = (start_date, end_date, signal_type, layout, bucket, negotiate_columnar_format(), etag)
+                cached = cached_range(signal_cache, cache_key, start_date, end_date + bucket_length)
+                if cached:
+                    return cached
+                
+                return rollup_signals_response(model, bucket, columns, start_date, end_date, layout)
+            
+            # Answer conditional requests before reading any row
+            criteria = [Signal.signal_id == signal_type_id] if signal_type_id is not None else []
+            not_modified, etag = conditional_range(
+                Signal, start_date, end_date, *criteria, page=(limit, after)
+            )
+            if not_modified:
+                return not_modified
+            
+            # Serve repeated range queries from the in-process result cache, keyed
+            # on the version of the range so a missed invalidation cannot serve
+            # a stale body under a fresh ETag
+            cache_key = (start_date, end_date, signal_type, layout, limit, after, negotiate_columnar_format(), etag)
+            cached = cached_range(signal_cache, cache_key, start_date, end_date)
+            if cached:
+                return cached
+            
+            # One record per window, pivoted in SQL
+            if layout == "wide":
+                columns = [(signal_type_id, signal_type)] if signal_type else signal_types.items()
+                return wide_signals_response(columns, start_date, end_date)
+            
             # Base query
             query = Signal.query.filter(
                 Signal.timestamp >= start_date,
@@ -174,18 +785,45 @@ def create_app():
             )
             
             # Filter by signal type if provided
-            if signal_type:
-                # Get signal type ID by name
-                signal_type_obj = SignalType.query.filter_by(name=signal_type).first()
-                if not signal_type_obj:
-                    return jsonify({
-                        "error": "Invalid signal type"
-                    }), 400
-                
-                query = query.filter(Signal.signal_id == signal_type_obj.id)
+            if signal_type_id is not None:
+                query = query.filter(Signal.signal_id == signal_type_id)
+            
+            # Seek past the last row of the previous page, never OFFSET
+            if after:
+                query = query.filter(tuple_(Signal.timestamp, Signal.id) > after)
+            
+            query = query.order_by(Signal.timestamp, Signal.id)
+            
+            # Fetch a bounded page when a limit is given
+            if limit:
+                signals, next_cursor = split_page(query.limit(limit + 1).all(), limit)
+            else:
+                signals, next_cursor = None, None
+            headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+            
+            # Typed columnar batches for clients that ask for Arrow or Parquet
+            columnar_mimetype = negotiate_columnar_format()
+            if columnar_mimetype:
+                rows = (
+                    (
+                        signal.id,
+                        signal.name,
+                        signal.timestamp,
+                        signal.value,
+                        signal_types.name_for(signal.signal_id),
+                        json.dumps(signal.data) if signal.data else None
+                    )
+                    for signal in (signals if signals is not None else query.yield_per(STREAM_BATCH_SIZE))
+                )
+                response = columnar_response(
+                    record_batches(rows, SIGNAL_ARROW_SCHEMA), SIGNAL_ARROW_SCHEMA, columnar_mimetype
+                )
+                response.headers.update(headers)
+                return response
             
             # Execute query
-            signals = query.order_by(Signal.timestamp).all()
+            if signals is None:
+                signals = query.all()
             
             if not signals:
                 return jsonify({
@@ -198,7 +836,7 @@ def create_app():
             result = []
             for signal in signals:
                 # Get signal type name
-                signal_type_name = SignalType.query.get(signal.signal_id).name
+                signal_type_name = signal_types.name_for(signal.signal_id)
                 
                 signal_dict = {
                     "id": signal.id,
@@ -218,7 +856,8 @@ def create_app():
                 "data": result,
                 "count": len(result),
                 "start_date": start_date.isoformat(),
-                "end_date": end_date.isoformat()
+                "end_date": end_date.isoformat(),
+                "next_cursor": next_cursor
             })
         
         except Exception as e:
@@ -226,6 +865,40 @@ def create_app():
             return jsonify({
                 "error": f"Internal server error: {str(e)}"
             }), 500
+
+    @app.route('/api/cache/stats')
+    def cache_stats():
+        """
+        API endpoint exposing the /api/signals result cache counters
+        """
+        return jsonify(signal_cache.stats())
+
+    @app.route('/api/cache/invalidate', methods=['POST'])
+    def invalidate_cache():
+        """
+        API endpoint used by ETL writers to drop cached signals overlapping the windows they loaded
+        """
+        token = request.headers.get("X-Cache-Token", "")
+        if not CACHE_INVALIDATE_TOKEN or not hmac.compare_digest(token, CACHE_INVALIDATE_TOKEN):
+            return jsonify({
+                "error": "A valid X-Cache-Token header is required"
+            }), 403
+        
+        try:
+            data = request.get_json() or {}
+            start_date = datetime.fromisoformat(data['start_date'])
+            end_date = datetime.fromisoformat(data['end_date'])
+        except (KeyError, TypeError, ValueError):
+            return jsonify({
+                "error": "start_date and end_date are required in ISO format"
+            }), 400
+
+        invalidated = signal_cache.invalidate_range(start_date, end_date)
+        return jsonify({
+            "status": "success",
+            "invalidated": invalidated
+        })
+
     @app.route('/api/generate-data', methods=['POST'])
     def generate_data():
         try:
@@ -0,0 +1,79 @@
+"""
+Wide-to-long materialization of aggregated windows into signal rows
+
+An aggregated frame has one row per window and one column per statistic;
+the signal table has one row per window and signal type. The reshape is
+done on whole numpy arrays instead of walking the frame row by row.
+"""
+import numpy as np
+import pandas as pd
+
+# Aggregated columns stored as signals, and their signal type ids
+SIGNAL_TYPE_MAPPING = {
+    "wind_speed_mean": 1,  # wind_speed_avg
+    "wind_speed_min": 2,   # wind_speed_min
+    "wind_speed_max": 3,   # wind_speed_max
+    "wind_speed_std": 4,   # wind_speed_std
+    "power_mean": 5,       # power_avg
+    "power_min": 6,        # power_min
+    "power_max": 7,        # power_max
+    "power_std": 8,        # power_std
+    "wind_speed_p5": 9,
+    "wind_speed_p50": 10,
+    "wind_speed_p95": 11,
+    "power_p5": 12,
+    "power_p50": 13,
+    "power_p95": 14,
+}
+
+
+def melt_signals(df, mapping=SIGNAL_TYPE_MAPPING, data_as_json=True):
+    """
+    Reshape an aggregated frame into signal columns
+
+    Signals are ordered by window, then by the mapping order, like the
+    row-by-row loop this replaces.
+
+    Args:
+        df: Aggregated frame with `timestamp` and the mapped columns
+        mapping: Column name -> signal type id; columns absent from the frame are skipped
+        data_as_json: Return the per-window `data` payload as JSON strings
+            (for DB-API writers) instead of dictionaries (for JSON columns)
+
+    Returns:
+        Dictionary of equally long numpy arrays: name, timestamp, signal_id,
+        value and data
+    """
+    columns = [col for col in mapping if col in df.columns]
+    n_windows = len(df)
+
+    # Every value of a window shares the window's data payload
+    payload = df[columns].astype(np.float64)
+    if data_as_json:
+        lines = payload.to_json(orient="records", lines=True, double_precision=15).splitlines() if n_windows else []
+        data = np.array(lines, dtype=object)
+    else:
+        data = np.empty(n_windows, dtype=object)
+        data[:] = payload.to_dict(orient="records")
+
+    return {
+        "name": np.tile(np.array(columns, dtype=object), n_windows),
+        "timestamp": np.repeat(pd.to_datetime(df["timestamp"]).to_numpy(dtype="datetime64[us]"), len(columns)),
+        "signal_id": np.tile(np.array([mapping[col] for col in columns], dtype=np.int64), n_windows),
+        "value": payload.to_numpy().ravel(),
+        "data": np.repeat(data, len(columns)),
+    }
+
+
+def signal_records(signals):
+    """
+    Zip melted signal columns into (name, timestamp, signal_id, value, data)
+    tuples of Python scalars, ready for `executemany`-style writers
+    """
+    return list(zip(
+        signals["name"].tolist(),
+        signals["timestamp"].astype(object).tolist(),
+        signals["signal_id"].tolist(),
+        signals["value"].tolist(),
+        signals["data"].tolist(),
+    ))
@@ -8,8 +8,11 @@ class Data(db.Model):
     """
     __tablename__ = "data"
     
-    id = db.Column(db.Integer, primary_key=True, index=True)
-    timestamp = db.Column(db.DateTime, nullable=False, index=True)
+    # Range reads seek and order on (timestamp, id), see migrations.py
+    __table_args__ = (db.Index("ix_data_timestamp_id", "timestamp", "id"),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    timestamp = db.Column(db.DateTime, nullable=False)
     wind_speed = db.Column(db.Float, nullable=False)
     power = db.Column(db.Float, nullable=False)
     ambient_temperature = db.Column(db.Float, nullable=False)
@@ -38,6 +41,9 @@ class Signal(db.Model):
     """
     __tablename__ = "signal"
     
+    # One row per signal type and window; loads merge on this key
+    __table_args__ = (db.Index("ix_signal_signal_id_timestamp", "signal_id", "timestamp", unique=True),)
+    
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     data = db.Column(JSON, nullable=True)
@@ -51,6 +57,32 @@ class Signal(db.Model):
     def __repr__(self):
         return f"<Signal(id={self.id}, name={self.name}, timestamp={self.timestamp}, value={self.value})>"
 
+class SignalWindow(db.Model):
+    """
+    Every statistic of one 10-minute window in one row of float8 columns;
+    on Postgres the signal table is a view over it
+    """
+    __tablename__ = "signal_window"
+    
+    timestamp = db.Column(db.DateTime, primary_key=True)
+    wind_speed_mean = db.Column(db.Float)
+    wind_speed_min = db.Column(db.Float)
+    wind_speed_max = db.Column(db.Float)
+    wind_speed_std = db.Column(db.Float)
+    power_mean = db.Column(db.Float)
+    power_min = db.Column(db.Float)
+    power_max = db.Column(db.Float)
+    power_std = db.Column(db.Float)
+    wind_speed_p5 = db.Column(db.Float)
+    wind_speed_p50 = db.Column(db.Float)
+    wind_speed_p95 = db.Column(db.Float)
+    power_p5 = db.Column(db.Float)
+    power_p50 = db.Column(db.Float)
+    power_p95 = db.Column(db.Float)
+    
+    def __repr__(self):
+        return f"<SignalWindow(timestamp={self.timestamp})>"
+
 class SignalData(db.Model):
     """
     Model for additional signal data storage (if needed)
@@ -67,3 +99,50 @@ class SignalData(db.Model):
     
     def __repr__(self):
         return f"<SignalData(id={self.id}, signal_id={self.signal_id}, key={self.key}, value={self.value})>"
+
+class PartialAggregateMixin:
+    """
+    Mergeable statistics of one series over one time bucket
+    """
+    series = db.Column(db.String(50), primary_key=True)
+    timestamp = db.Column(db.DateTime, primary_key=True)
+    count = db.Column(db.Integer, nullable=False)
+    sum = db.Column(db.Float, nullable=False)
+    sumsq = db.Column(db.Float, nullable=False)
+    min = db.Column(db.Float, nullable=False)
+    max = db.Column(db.Float, nullable=False)
+    
+    def __repr__(self):
+        return f"<{type(self).__name__}(series={self.series}, timestamp={self.timestamp}, count={self.count})>"
+
+class SignalPartial(PartialAggregateMixin, db.Model):
+    """
+    Partial aggregates of every loaded 10-minute window
+    """
+    __tablename__ = "signal_partial_10m"
+
+class SignalRollupHourly(PartialAggregateMixin, db.Model):
+    """
+    Hourly rollup merged from the 10-minute partials
+    """
+    __tablename__ = "signal_rollup_1h"
+
+class SignalRollupDaily(PartialAggregateMixin, db.Model):
+    """
+    Daily rollup merged from the hourly rollup
+    """
+    __tablename__ = "signal_rollup_1d"
+
+class SignalSketch(db.Model):
+    """
+    Serialized quantile sketch of one series over one 10m, 1h or 1d bucket
+    """
+    __tablename__ = "signal_sketch"
+    
+    series = db.Column(db.String(50), primary_key=True)
+    bucket = db.Column(db.String(3), primary_key=True)
+    timestamp = db.Column(db.DateTime, primary_key=True)
+    sketch = db.Column(db.LargeBinary, nullable=False)
+    
+    def __repr__(self):
+        return f"<SignalSketch(series={self.series}, bucket={self.bucket}, timestamp={self.timestamp})>"
@@ -0,0 +1,293 @@
+"""
+Monthly range partitions of the time series tables on Postgres
+
+data and signal_window are partitioned by month on `timestamp`, so range
+reads of /api/data and /api/signals only scan the months they cover, and
+vacuum and index maintenance work on one month at a time. Every partitioned
+table also has a default partition, so a write never fails for lack of a
+partition: the maintenance moves its rows into their monthly partition.
+
+Maintenance, run daily by Dagster (or `python partitions.py`):
+  - creates the partitions of the current month and the next
+    PARTITION_PREMAKE_MONTHS months
+  - creates the partitions of months that have rows in the default partition
+  - detaches (or, with PARTITION_EXPIRE_MODE=drop, drops) partitions older
+    than the retention of their table, together with the rows of those
+    months left in the default partition; a retention of 0 keeps every month
+
+Usage: python partitions.py [--source] [--url URL]
+"""
+import os
+import re
+import sys
+import logging
+import argparse
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Months created ahead of the current one
+PARTITION_PREMAKE_MONTHS = int(os.getenv("PARTITION_PREMAKE_MONTHS", "3"))
+
+# Months of history kept per table; 0 keeps every month
+DATA_RETENTION_MONTHS = int(os.getenv("DATA_RETENTION_MONTHS", "0"))
+SIGNAL_RETENTION_MONTHS = int(os.getenv("SIGNAL_RETENTION_MONTHS", "0"))
+
+# "detach" keeps expired partitions as standalone tables, "drop" deletes them
+PARTITION_EXPIRE_MODE = os.getenv("PARTITION_EXPIRE_MODE", "detach")
+
+# Tables partitioned by month on timestamp, with their retention
+PARTITIONED_TABLES = {
+    "data": DATA_RETENTION_MONTHS,
+    "signal_window": SIGNAL_RETENTION_MONTHS,
+}
+
+# Key of the Postgres advisory lock held while partitions are changed
+PARTITION_LOCK_ID = 4242025
+
+PARTITION_CHILDREN_SQL = """
+SELECT c.relname FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = to_regclass(%(table)s)
+"""
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f"{table}_{month:%Y_%m}"
+
+
+def relation_kind(cursor, name):
+    """
+    Return the pg_class relkind of a relation ("r" table, "p" partitioned) or None
+    """
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%(name)s)", {"name": name})
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def monthly_partitions(cursor, table):
+    """
+    Return {month: partition name} of the monthly partitions attached to a table
+    """
+    cursor.execute(PARTITION_CHILDREN_SQL, {"table": table})
+    partitions = {}
+    for (name,) in cursor.fetchall():
+        match = re.fullmatch(rf"{table}_(\d{{4}})_(\d{{2}})", name)
+        if match:
+            partitions[datetime(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def move_default_rows(cursor, table, name, month):
+    """
+    Move the rows of one month from the default partition into table `name`
+
+    Returns:
+        Number of rows moved
+    """
+    cursor.execute(f"""
+        WITH moved AS (
+            DELETE FROM {table}_default
+            WHERE timestamp >= %(lower)s AND timestamp < %(upper)s
+            RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """, {"lower": month, "upper": add_months(month, 1)})
+    return cursor.rowcount
+
+
+def create_partition(cursor, table, month):
+    """
+    Create the partition of one month, moving its rows out of the default partition
+
+    Returns:
+        Number of rows moved from the default partition
+    """
+    name = partition_name(table, month)
+    bounds = {"lower": month, "upper": add_months(month, 1)}
+
+    # Built detached so the rows of the month can be moved in before it is
+    # attached; attaching checks the default partition holds none of them
+    cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)")
+    moved = move_default_rows(cursor, table, name, month)
+    cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%(lower)s) TO (%(upper)s)", bounds)
+
+    logger.info(f"Created partition {name} ({moved} rows moved from {table}_default)")
+    return moved
+
+
+def expire_partitions(cursor, table, before, mode=PARTITION_EXPIRE_MODE):
+    """
+    Detach or drop the partitions of months before `before`
+
+    Rows of those months in the default partition are deleted with
+    mode="drop". Otherwise they are moved into the detached table of their
+    month, which is created when the month never had a partition.
+
+    Returns:
+        Names of the expired partitions
+    """
+    expired = []
+    for month, name in sorted(monthly_partitions(cursor, table).items()):
+        if month >= before:
+            break
+        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+        if mode == "drop":
+            cursor.execute(f"DROP TABLE {name}")
+        expired.append(name)
+        logger.info(f"Expired partition {name} ({'dropped' if mode == 'drop' else 'detached'})")
+
+    if mode == "drop":
+        cursor.execute(f"DELETE FROM {table}_default WHERE timestamp < %(before)s", {"before": before})
+        return expired
+
+    cursor.execute(
+        f"SELECT DISTINCT date_trunc('month', timestamp) FROM {table}_default WHERE timestamp < %(before)s",
+        {"before": before}
+    )
+    for (month,) in sorted(cursor.fetchall()):
+        name = partition_name(table, month)
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {name} (LIKE {table} INCLUDING DEFAULTS)")
+        moved = move_default_rows(cursor, table, name, month)
+        if name not in expired:
+            expired.append(name)
+        logger.info(f"Moved {moved} rows of {month:%Y-%m} from {table}_default into detached {name}")
+    return expired
+
+
+def partition_table(cursor, table, primary_key, now=None):
+    """
+    Convert a plain table into a table partitioned by month on timestamp
+
+    Columns, defaults, the serial sequence and the indexes of the table are
+    kept; the primary key must include timestamp, as Postgres requires of
+    unique keys of partitioned tables. Partitions are created for the months
+    that have rows and the months ahead, and the rows are copied into them.
+    Views over the table are dropped with it and must be recreated by the
+    caller. Runs inside the caller's transaction.
+
+    Args:
+        cursor: DB-API cursor of a Postgres connection
+        table: Name of the table
+        primary_key: Columns of the new primary key
+        now: Current time, for the months ahead
+
+    Returns:
+        Number of rows copied
+    """
+    old = f"{table}_unpartitioned"
+
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %(table)s AND indexname <> %(pkey)s",
+        {"table": table, "pkey": f"{table}_pkey"}
+    )
+    indexes = [indexdef for (indexdef,) in cursor.fetchall()]
+
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    cursor.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE (timestamp)")
+    cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    # The months that have rows, and the current month and the months ahead
+    current = month_start(now or datetime.now())
+    months = {add_months(current, offset) for offset in range(PARTITION_PREMAKE_MONTHS + 1)}
+    cursor.execute(f"SELECT DISTINCT date_trunc('month', timestamp) FROM {old}")
+    months.update(month for (month,) in cursor.fetchall())
+    for month in sorted(months):
+        cursor.execute(
+            f"CREATE TABLE {partition_name(table, month)} PARTITION OF {table} FOR VALUES FROM (%(lower)s) TO (%(upper)s)",
+            {"lower": month, "upper": add_months(month, 1)}
+        )
+
+    cursor.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    copied = cursor.rowcount
+
+    # The serial sequence belongs to the old id column and would be dropped with it
+    if "id" in primary_key:
+        cursor.execute("SELECT pg_get_serial_sequence(%(table)s, 'id')", {"table": old})
+        sequence = cursor.fetchone()[0]
+        if sequence:
+            cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+
+    cursor.execute(f"DROP TABLE {old} CASCADE")
+    cursor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY ({', '.join(primary_key)})")
+    for indexdef in indexes:
+        cursor.execute(indexdef)
+
+    logger.info(f"Partitioned {table} by month ({copied} rows copied)")
+    return copied
+
+
+def maintain_partitions(cursor, now=None, premake=PARTITION_PREMAKE_MONTHS, mode=PARTITION_EXPIRE_MODE):
+    """
+    Create upcoming and backfilled partitions and expire old ones, for every
+    table of PARTITIONED_TABLES that is partitioned in this database. Runs
+    inside the caller's transaction.
+
+    Returns:
+        {table: {"created": [...], "moved": rows, "expired": [...]}}
+    """
+    cursor.execute("SELECT pg_advisory_xact_lock(%(id)s)", {"id": PARTITION_LOCK_ID})
+    current = month_start(now or datetime.now())
+
+    summary = {}
+    for table, retention in PARTITIONED_TABLES.items():
+        if relation_kind(cursor, table) != "p":
+            continue
+
+        before = add_months(current, -retention) if retention else None
+        existing = monthly_partitions(cursor, table)
+
+        # Upcoming months, and the months whose rows landed in the default partition
+        months = {add_months(current, offset) for offset in range(premake + 1)}
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', timestamp) FROM {table}_default WHERE timestamp >= %(before)s",
+            {"before": before or datetime.min}
+        )
+        months.update(month for (month,) in cursor.fetchall())
+
+        created, moved = [], 0
+        for month in sorted(months - set(existing)):
+            moved += create_partition(cursor, table, month)
+            created.append(partition_name(table, month))
+
+        expired = expire_partitions(cursor, table, before, mode) if before else []
+        summary[table] = {"created": created, "moved": moved, "expired": expired}
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", action="store_true", help="Use the source database (SOURCE_DB_URI)")
+    parser.add_argument("--url", help="Database URL, instead of TARGET_DB_URI or SOURCE_DB_URI")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+
+    from sqlalchemy import create_engine
+    from migrations import TARGET_DB_URI, SOURCE_DB_URI
+
+    url = args.url or (SOURCE_DB_URI if args.source else TARGET_DB_URI)
+    engine = create_engine(url.replace("postgresql://", "postgresql+psycopg2://", 1))
+    with engine.begin() as connection:
+        summary = maintain_partitions(connection.connection.cursor())
+
+    for table, result in summary.items():
+        print(f"{table}: created {result['created']}, moved {result['moved']} rows, expired {result['expired']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Reusable SQL queries over the target database tables
+"""
+from sqlalchemy import null, select
+from models import SignalWindow
+from materialize import SIGNAL_TYPE_MAPPING
+
+
+def signal_wide_query(columns, start_date, end_date):
+    """
+    Read one row per window straight from signal_window
+
+    Args:
+        columns: List of (signal_id, name) pairs that become the value columns;
+            signal types without a signal_window column read as NULL
+        start_date: Start datetime (inclusive)
+        end_date: End datetime (inclusive)
+
+    Returns:
+        Select yielding (timestamp, *values) tuples ordered by timestamp
+    """
+    window_columns = {signal_id: column for column, signal_id in SIGNAL_TYPE_MAPPING.items()}
+    return select(
+        SignalWindow.timestamp,
+        *(
+            (getattr(SignalWindow, window_columns[signal_id]) if signal_id in window_columns else null()).label(name)
+            for signal_id, name in columns
+        )
+    ).where(
+        SignalWindow.timestamp >= start_date,
+        SignalWindow.timestamp <= end_date
+    ).order_by(SignalWindow.timestamp)
+
+
+def rollup_query(model, series, start_date, end_date):
+    """
+    Read the merged partials of a rollup tier
+
+    Args:
+        model: Partial aggregate model of the tier
+        series: Series names to read
+        start_date: Start datetime (inclusive)
+        end_date: End datetime (inclusive)
+
+    Returns:
+        Select yielding (series, timestamp, count, sum, sumsq, min, max) tuples
+        ordered by timestamp
+    """
+    return select(
+        model.series, model.timestamp, model.count, model.sum, model.sumsq, model.min, model.max
+    ).where(
+        model.timestamp >= start_date,
+        model.timestamp <= end_date,
+        model.series.in_(series)
+    ).order_by(model.timestamp, model.series)
+
+
+def sketch_query(model, bucket, series, start_date, end_date):
+    """
+    Read the stored quantile sketches of one bucket tier
+
+    Returns:
+        Select yielding (series, timestamp, sketch) tuples ordered by timestamp
+    """
+    return select(model.series, model.timestamp, model.sketch).where(
+        model.bucket == bucket,
+        model.timestamp >= start_date,
+        model.timestamp <= end_date,
+        model.series.in_(series)
+    ).order_by(model.timestamp, model.series)
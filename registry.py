@@ -0,0 +1,93 @@
+"""
+Process-wide registry of signal types
+
+Maps signal type ids to names and back so request handlers can resolve
+filters and label rows without extra round trips to the database.
+"""
+import logging
+import threading
+from sqlalchemy import event, select
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+
+class SignalTypeRegistry:
+    """
+    In-memory id <-> name map of the signal_type table
+
+    The map is loaded by `init_app`, reloaded after signal types are written
+    through the ORM in this process, and reloaded once on a lookup miss so
+    types added by other processes are picked up.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_id = {}
+        self._by_name = {}
+        self._stale = True
+
+    def init_app(self, app):
+        """
+        Load the registry and subscribe to changes of the SignalType model
+        """
+        from models import SignalType
+
+        for event_name in ("after_insert", "after_update", "after_delete"):
+            event.listen(SignalType, event_name, self._mark_stale)
+
+        with app.app_context():
+            self.refresh()
+
+        app.extensions["signal_types"] = self
+
+    def refresh(self):
+        """
+        Reload every signal type from the database
+        """
+        from models import SignalType
+
+        rows = db.session.execute(select(SignalType.id, SignalType.name)).all()
+        with self._lock:
+            self._by_id = {signal_id: name for signal_id, name in rows}
+            self._by_name = {name: signal_id for signal_id, name in rows}
+            self._stale = False
+
+        logger.debug(f"Loaded {len(rows)} signal types")
+
+    def _mark_stale(self, *args):
+        self._stale = True
+
+    def _lookup(self, mapping_name, key):
+        if self._stale:
+            self.refresh()
+
+        value = getattr(self, mapping_name).get(key)
+        if value is None:
+            # The type may have been created by another process
+            self.refresh()
+            value = getattr(self, mapping_name).get(key)
+        return value
+
+    def id_for(self, name):
+        """
+        Return the id of a signal type name, or None if it does not exist
+        """
+        return self._lookup("_by_name", name)
+
+    def name_for(self, signal_id):
+        """
+        Return the name of a signal type id, or None if it does not exist
+        """
+        return self._lookup("_by_id", signal_id)
+
+    def items(self):
+        """
+        Return every (id, name) pair ordered by id
+        """
+        if self._stale:
+            self.refresh()
+        return sorted(self._by_id.items())
+
+
+signal_types = SignalTypeRegistry()
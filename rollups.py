@@ -0,0 +1,292 @@
+"""
+Hierarchical rollups of signal statistics: 10 minutes -> 1 hour -> 1 day
+
+Every loaded 10-minute window stores mergeable partials (count, sum, sum of
+squares, min, max) per series. Hourly rows are merged from those partials
+and daily rows from the hourly ones, so no tier ever rescans raw data and a
+reloaded window only recomputes the hour and day that contain it.
+
+Quantile sketches follow the same tiers in the signal_sketch table; they
+merge in Python, so the hourly and daily sketches are rebuilt from the
+stored sketches of the tier below.
+
+Writers pass a DB-API cursor so the partials and rollups are written in the
+same transaction as the signals of the window.
+"""
+import math
+from datetime import datetime, timedelta
+import pandas as pd
+from loader import stage_rows
+from sketches import QUANTILES, QuantileSketch
+
+# Bucket name -> (table, bucket length)
+ROLLUP_TIERS = {
+    "10m": ("signal_partial_10m", timedelta(minutes=10)),
+    "1h": ("signal_rollup_1h", timedelta(hours=1)),
+    "1d": ("signal_rollup_1d", timedelta(days=1)),
+}
+
+# Each tier is merged from the previous one: (source, target, date_trunc unit)
+ROLLUP_CHAIN = [
+    ("10m", "1h", "hour"),
+    ("1h", "1d", "day"),
+]
+
+# Signal type name suffixes and the statistic they hold
+SIGNAL_STATS = {"avg": "mean", "min": "min", "max": "max", "std": "std"}
+
+PARTIAL_COLUMNS = ["series", "timestamp", "count", "sum", "sumsq", "min", "max"]
+SKETCH_COLUMNS = ["series", "bucket", "timestamp", "sketch"]
+
+# Partials and sketches are COPYed into stage tables (see loader.stage_rows)
+# and merged from there in one statement
+MERGE_PARTIALS_SQL = """
+INSERT INTO signal_partial_10m (series, timestamp, count, sum, sumsq, min, max)
+SELECT series, timestamp, count, sum, sumsq, min, max
+FROM {stage}
+ON CONFLICT (series, timestamp) DO UPDATE SET
+    count = EXCLUDED.count,
+    sum = EXCLUDED.sum,
+    sumsq = EXCLUDED.sumsq,
+    min = EXCLUDED.min,
+    max = EXCLUDED.max
+"""
+
+DELETE_PARTIALS_SQL = """
+DELETE FROM signal_partial_10m
+WHERE series = ANY(%(series)s) AND timestamp >= %(start)s AND timestamp <= %(end)s
+"""
+
+DELETE_ROLLUP_SQL = """
+DELETE FROM {target}
+WHERE timestamp >= %(start)s AND timestamp < %(end)s
+"""
+
+MERGE_ROLLUP_SQL = """
+INSERT INTO {target} (series, timestamp, count, sum, sumsq, min, max)
+SELECT series, date_trunc('{unit}', timestamp), sum(count), sum(sum), sum(sumsq), min(min), max(max)
+FROM {source}
+WHERE timestamp >= %(start)s AND timestamp < %(end)s
+GROUP BY 1, 2
+ON CONFLICT (series, timestamp) DO UPDATE SET
+    count = EXCLUDED.count,
+    sum = EXCLUDED.sum,
+    sumsq = EXCLUDED.sumsq,
+    min = EXCLUDED.min,
+    max = EXCLUDED.max
+"""
+
+
+MERGE_SKETCHES_SQL = """
+INSERT INTO signal_sketch (series, bucket, timestamp, sketch)
+SELECT series, bucket, timestamp, sketch
+FROM {stage}
+ON CONFLICT (series, bucket, timestamp) DO UPDATE SET
+    sketch = EXCLUDED.sketch
+"""
+
+DELETE_SKETCHES_SQL = """
+DELETE FROM signal_sketch
+WHERE series = ANY(%(series)s) AND bucket = %(bucket)s AND timestamp >= %(start)s AND timestamp < %(end)s
+"""
+
+SELECT_SKETCHES_SQL = """
+SELECT series, timestamp, sketch
+FROM signal_sketch
+WHERE bucket = %(bucket)s AND timestamp >= %(start)s AND timestamp < %(end)s
+"""
+
+
+def signal_stat(signal_type_name):
+    """
+    Split a signal type name such as "wind_speed_avg" into the series and
+    statistic a rollup can answer it from
+
+    Returns:
+        Tuple of (series, statistic), or None for types rollups do not hold
+    """
+    series, _, suffix = signal_type_name.rpartition("_")
+    if series and suffix in QUANTILES:
+        return series, suffix
+    if not series or suffix not in SIGNAL_STATS:
+        return None
+    return series, SIGNAL_STATS[suffix]
+
+
+def partial_stats(count, total, sumsq, minimum, maximum):
+    """
+    Turn merged partials back into the signal statistics
+
+    The standard deviation of a single-row bucket is 0, like the stored
+    10-minute signals.
+    """
+    mean = total / count
+    if count > 1:
+        std = math.sqrt(max(sumsq - total * mean, 0.0) / (count - 1))
+    else:
+        std = 0.0
+    return {"mean": mean, "min": minimum, "max": maximum, "std": std}
+
+
+def partial_rows(df, columns):
+    """
+    Extract the 10-minute partials of an aggregated frame
+
+    Args:
+        df: Frame from `aggregate_windows` with the PARTIAL_STATS of every column
+        columns: Series to extract
+
+    Returns:
+        List of dicts with the PARTIAL_COLUMNS of every window; windows without
+        rows are skipped, `store_partials` deletes their stored partials instead
+    """
+    rows = []
+    for col in columns:
+        occupied = df[df[f"{col}_count"] > 0]
+        for timestamp, count, total, sumsq, minimum, maximum in zip(
+            occupied["timestamp"],
+            occupied[f"{col}_count"],
+            occupied[f"{col}_sum"],
+            occupied[f"{col}_sumsq"],
+            occupied[f"{col}_min"],
+            occupied[f"{col}_max"],
+        ):
+            rows.append({
+                "series": col,
+                "timestamp": pd.Timestamp(timestamp).to_pydatetime(),
+                "count": int(count),
+                "sum": float(total),
+                "sumsq": float(sumsq),
+                "min": float(minimum),
+                "max": float(maximum),
+            })
+    return rows
+
+
+def _floor(timestamp, unit):
+    if unit == "day":
+        return datetime.combine(timestamp.date(), datetime.min.time())
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def refresh_rollups(cursor, start, end):
+    """
+    Re-merge the hourly and daily buckets containing the windows in [start, end]
+
+    The buckets are replaced rather than upserted, so a bucket whose windows
+    were all emptied by a reload disappears as well.
+
+    Args:
+        cursor: DB-API cursor of the target database
+        start: First reloaded window
+        end: Last reloaded window
+    """
+    for source, target, unit in ROLLUP_CHAIN:
+        step = ROLLUP_TIERS[target][1]
+        bounds = {"start": _floor(start, unit), "end": _floor(end, unit) + step}
+        cursor.execute(DELETE_ROLLUP_SQL.format(target=ROLLUP_TIERS[target][0]), bounds)
+        cursor.execute(
+            MERGE_ROLLUP_SQL.format(target=ROLLUP_TIERS[target][0], source=ROLLUP_TIERS[source][0], unit=unit),
+            bounds,
+        )
+
+
+def _unique(rows, *key):
+    """
+    Keep the last row of every key, like the per-row upserts these replace
+    """
+    return list({tuple(row[column] for column in key): row for row in rows}.values())
+
+
+def _merge_sketches(cursor, rows):
+    stage = stage_rows(cursor, "signal_sketch", SKETCH_COLUMNS, _unique(rows, "series", "bucket", "timestamp"))
+    cursor.execute(MERGE_SKETCHES_SQL.format(stage=stage))
+
+
+def _reloaded_range(df):
+    """
+    First and last window of an aggregated frame as datetimes
+    """
+    timestamps = pd.to_datetime(df["timestamp"])
+    return timestamps.min().to_pydatetime(), timestamps.max().to_pydatetime()
+
+
+def store_partials(cursor, df, columns):
+    """
+    Replace the 10-minute partials of the windows of an aggregated frame and
+    refresh the rollups that contain them
+
+    Every window between the first and last of the frame is reloaded: the
+    stored partials of windows that no longer have rows are deleted.
+
+    Returns:
+        Number of partial rows written
+    """
+    if df.empty:
+        return 0
+
+    start, end = _reloaded_range(df)
+    cursor.execute(DELETE_PARTIALS_SQL, {"series": list(columns), "start": start, "end": end})
+
+    rows = partial_rows(df, columns)
+    if rows:
+        stage = stage_rows(cursor, ROLLUP_TIERS["10m"][0], PARTIAL_COLUMNS, _unique(rows, "series", "timestamp"))
+        cursor.execute(MERGE_PARTIALS_SQL.format(stage=stage))
+    refresh_rollups(cursor, start, end)
+    return len(rows)
+
+
+def store_sketches(cursor, df, columns):
+    """
+    Replace the 10-minute quantile sketches of the windows of an aggregated
+    frame and rebuild the hourly and daily sketches that contain them
+
+    Args:
+        cursor: DB-API cursor of the target database
+        df: Aggregated frame with `{column}_sketch` blobs and `{column}_count`
+        columns: Series to store
+
+    Returns:
+        Number of 10-minute sketches written
+    """
+    if df.empty:
+        return 0
+
+    rows = []
+    for col in columns:
+        occupied = df[df[f"{col}_count"] > 0]
+        for timestamp, blob in zip(occupied["timestamp"], occupied[f"{col}_sketch"]):
+            rows.append({
+                "series": col,
+                "bucket": "10m",
+                "timestamp": pd.Timestamp(timestamp).to_pydatetime(),
+                "sketch": blob,
+            })
+
+    start, end = _reloaded_range(df)
+    cursor.execute(DELETE_SKETCHES_SQL, {
+        "series": list(columns),
+        "bucket": "10m",
+        "start": start,
+        "end": end + ROLLUP_TIERS["10m"][1],
+    })
+    if rows:
+        _merge_sketches(cursor, rows)
+
+    for source, target, unit in ROLLUP_CHAIN:
+        bounds = {"start": _floor(start, unit), "end": _floor(end, unit) + ROLLUP_TIERS[target][1]}
+        cursor.execute(SELECT_SKETCHES_SQL, {"bucket": source, **bounds})
+
+        merged = {}
+        for series, timestamp, blob in cursor.fetchall():
+            key = (series, _floor(timestamp, unit))
+            sketch = QuantileSketch.from_bytes(blob)
+            merged[key] = merged[key].merge(sketch) if key in merged else sketch
+
+        cursor.execute(DELETE_SKETCHES_SQL, {"series": list(columns), "bucket": target, **bounds})
+        if merged:
+            _merge_sketches(cursor, [
+                {"series": series, "bucket": target, "timestamp": timestamp, "sketch": sketch.to_bytes()}
+                for (series, timestamp), sketch in merged.items()
+            ])
+    return len(rows)
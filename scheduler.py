@@ -10,7 +10,7 @@ from dagster.utils import file_relative_path
 import pandas as pd
 
 from transform import fetch_data_from_api, aggregate_data
-from database import get_db_session, init_target_db
+from database import init_target_db
 from models import Signal
 
 # Define resources for database connections
@@ -70,16 +70,12 @@ def transformed_signals(context, aggregated_data):
         context.log.warning("No aggregated data available to load")
         return {"loaded": 0}
     
-    # Save to target database
-    db_session = get_db_session()
-    try:
-        from transform import save_to_target_db
-        records_saved = save_to_target_db(aggregated_data, db_session)
-        
-        context.log.info(f"Loaded {records_saved} signals into target database")
-        return {"loaded": records_saved}
-    finally:
-        db_session.close()
+    # Save to target database over a pooled connection
+    from transform import save_to_target_db
+    records_saved = save_to_target_db(aggregated_data)
+    
+    context.log.info(f"Loaded {records_saved} signals into target database")
+    return {"loaded": records_saved}
 
 # Define a job that processes data for a specific day
 @job
@@ -0,0 +1,105 @@
+"""
+Compact per-window storage of signals
+
+The signal table used to hold one row per window and signal type, each with
+its name and a JSON copy of every value of the window. signal_window keeps
+one row per window with a float8 column per aggregated statistic instead,
+and on Postgres `signal` becomes a view that expands those rows back into
+the old (id, name, data, timestamp, signal_id, value) shape, so readers of
+the long layout are unchanged.
+
+Ids of the view are derived from the window and the signal type, so they
+are stable across reads and keep (timestamp, id) keyset cursors working.
+"""
+import logging
+from materialize import SIGNAL_TYPE_MAPPING
+
+logger = logging.getLogger(__name__)
+
+# Aggregated columns stored per window, in the order of the mapping
+WINDOW_COLUMNS = list(SIGNAL_TYPE_MAPPING)
+
+# Seconds per window: a view id is window number * 100 + signal type id
+WINDOW_SECONDS = 600
+
+CREATE_WINDOW_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS signal_window (
+    timestamp timestamp PRIMARY KEY,
+    {", ".join(f"{column} double precision" for column in WINDOW_COLUMNS)}
+)
+"""
+
+# One row per window and non-null statistic, like the table it replaces. The
+# data payload is built once per window: OFFSET 0 keeps the planner from
+# inlining it into every expanded row
+CREATE_SIGNAL_VIEW_SQL = f"""
+CREATE VIEW signal AS
+SELECT
+    floor(extract(epoch FROM w.timestamp) / {WINDOW_SECONDS})::bigint * 100 + v.signal_id AS id,
+    v.name::varchar(100) AS name,
+    d.data,
+    w.timestamp,
+    v.signal_id,
+    v.value
+FROM signal_window w
+CROSS JOIN LATERAL (
+    SELECT json_strip_nulls(json_build_object({", ".join(f"'{column}', w.{column}" for column in WINDOW_COLUMNS)})) AS data
+    OFFSET 0
+) d
+CROSS JOIN LATERAL (VALUES
+    {", ".join(f"({SIGNAL_TYPE_MAPPING[column]}, '{column}', w.{column})" for column in WINDOW_COLUMNS)}
+) AS v(signal_id, name, value)
+WHERE v.value IS NOT NULL
+"""
+
+# The newest row of every (window, signal type) wins, like the unique key did
+MIGRATE_SIGNALS_SQL = f"""
+INSERT INTO signal_window (timestamp, {", ".join(WINDOW_COLUMNS)})
+SELECT
+    timestamp,
+    {", ".join(
+        f"(array_agg(value ORDER BY id DESC) FILTER (WHERE signal_id = {SIGNAL_TYPE_MAPPING[column]}))[1]"
+        for column in WINDOW_COLUMNS
+    )}
+FROM signal
+GROUP BY timestamp
+ON CONFLICT (timestamp) DO NOTHING
+"""
+
+
+def signal_relation_kind(cursor):
+    """
+    Return the pg_class relkind of `signal` ("r" table, "v" view) or None
+    """
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('signal')")
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def migrate_signal_window(cursor):
+    """
+    Move a Postgres target database to signal_window storage
+
+    Windows of an existing signal table are copied into signal_window, the
+    table is dropped (with the foreign key of signal_data pointing at it)
+    and replaced by the compatibility view. Databases that already have the
+    view are left alone. Runs inside the caller's transaction.
+
+    Returns:
+        Number of windows copied from the signal table
+    """
+    cursor.execute(CREATE_WINDOW_TABLE_SQL)
+
+    kind = signal_relation_kind(cursor)
+    if kind == "v":
+        return 0
+
+    migrated = 0
+    if kind is not None:
+        cursor.execute(MIGRATE_SIGNALS_SQL)
+        migrated = cursor.rowcount
+        cursor.execute("DROP TABLE signal CASCADE")
+
+    cursor.execute(CREATE_SIGNAL_VIEW_SQL)
+    logger.info(f"Replaced the signal table with a view over signal_window ({migrated} windows migrated)")
+    return migrated
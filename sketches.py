@@ -0,0 +1,284 @@
+"""
+Mergeable quantile sketches for per-window percentile signals
+
+QuantileSketch follows DDSketch: values are counted in logarithmic buckets
+whose width guarantees a relative error of at most `relative_accuracy` on
+every quantile. Merging two sketches adds their bucket counts, so merged
+sketches are exactly the sketch of the combined values, and hourly or
+daily percentiles can be answered from stored 10-minute sketches without
+touching raw data.
+"""
+import math
+import struct
+import numpy as np
+import pandas as pd
+
+# Quantile signal statistics: name suffix -> quantile
+QUANTILES = {"p5": 0.05, "p50": 0.5, "p95": 0.95}
+
+# Relative error bound of stored sketches
+RELATIVE_ACCURACY = 0.01
+
+# Serialization header: version, relative accuracy, zero count, min, max,
+# number of positive buckets, number of negative buckets
+_HEADER = struct.Struct("<BdQddII")
+_VERSION = 1
+
+
+class QuantileSketch:
+    """
+    Relative-error quantile sketch over logarithmic buckets
+
+    Args:
+        relative_accuracy: Maximum relative error of quantile estimates
+    """
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def count(self):
+        return self.zero_count + sum(self.positive.values()) + sum(self.negative.values())
+
+    def bucket_keys(self, magnitudes):
+        """
+        Bucket index of each positive magnitude
+        """
+        return np.ceil(np.log(magnitudes) / self.log_gamma).astype(np.int64)
+
+    def add(self, values):
+        """
+        Add an array of values; NaN values are ignored
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.zero_count += int(np.count_nonzero(values == 0))
+
+        for store, magnitudes in ((self.positive, values[values > 0]), (self.negative, -values[values < 0])):
+            keys, counts = np.unique(self.bucket_keys(magnitudes), return_counts=True)
+            for key, count in zip(keys.tolist(), counts.tolist()):
+                store[key] = store.get(key, 0) + count
+
+    def merge(self, other):
+        """
+        Add the counts of another sketch with the same accuracy into this one
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _value(self, key, sign=1):
+        # Bucket midpoint in relative terms, kept within the observed range
+        value = sign * 2 * self.gamma ** key / (self.gamma + 1)
+        return min(max(value, self.min), self.max)
+
+    def quantile(self, q):
+        """
+        Estimate the q-quantile (0 <= q <= 1), or None for an empty sketch
+        """
+        count = self.count
+        if count == 0:
+            return None
+
+        rank = q * (count - 1)
+        seen = 0
+
+        # Most negative values first: largest magnitudes of the negative store
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return self._value(key, sign=-1)
+
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+
+        return self.max
+
+    def to_bytes(self):
+        """
+        Serialize into a compact binary blob
+        """
+        parts = [_HEADER.pack(
+            _VERSION, self.relative_accuracy, self.zero_count, self.min, self.max,
+            len(self.positive), len(self.negative)
+        )]
+        for store in (self.positive, self.negative):
+            keys = sorted(store)
+            parts.append(np.array(keys, dtype="<i4").tobytes())
+            parts.append(np.array([store[key] for key in keys], dtype="<u4").tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, blob):
+        """
+        Rebuild a sketch serialized with `to_bytes`
+        """
+        blob = bytes(blob)
+        version, accuracy, zero_count, minimum, maximum, n_positive, n_negative = _HEADER.unpack_from(blob)
+        if version != _VERSION:
+            raise ValueError(f"Unsupported sketch version: {version}")
+
+        sketch = cls(accuracy)
+        sketch.zero_count = zero_count
+        sketch.min = minimum
+        sketch.max = maximum
+
+        offset = _HEADER.size
+        for store, size in ((sketch.positive, n_positive), (sketch.negative, n_negative)):
+            keys = np.frombuffer(blob, dtype="<i4", count=size, offset=offset)
+            counts = np.frombuffer(blob, dtype="<u4", count=size, offset=offset + 4 * size)
+            store.update(zip(keys.tolist(), counts.tolist()))
+            offset += 8 * size
+        return sketch
+
+
+def sketches_from_buckets(window_ids, signs, keys, counts, minimums, maximums, relative_accuracy=RELATIVE_ACCURACY):
+    """
+    Build one sketch per window from bucket counts
+
+    Args:
+        window_ids: Window id of every (window, sign, key) bucket, grouped by window
+        signs: -1, 0 or 1 for each bucket (0 is the zero bucket)
+        keys: Bucket index of each bucket
+        counts: Number of values in each bucket
+        minimums: Window id -> minimum value
+        maximums: Window id -> maximum value
+
+    Returns:
+        Dictionary of window id -> QuantileSketch
+    """
+    sketches = {}
+    for window_id, sign, key, count in zip(
+        np.asarray(window_ids).tolist(), np.asarray(signs).tolist(),
+        np.asarray(keys).tolist(), np.asarray(counts).tolist()
+    ):
+        sketch = sketches.get(window_id)
+        if sketch is None:
+            sketch = sketches[window_id] = QuantileSketch(relative_accuracy)
+            sketch.min = float(minimums[window_id])
+            sketch.max = float(maximums[window_id])
+
+        if sign > 0:
+            sketch.positive[key] = sketch.positive.get(key, 0) + count
+        elif sign < 0:
+            sketch.negative[key] = sketch.negative.get(key, 0) + count
+        else:
+            sketch.zero_count += count
+    return sketches
+
+
+def window_sketches(window_ids, values, relative_accuracy=RELATIVE_ACCURACY):
+    """
+    Sketch the values of every window, bucketing all rows in one pass
+
+    Args:
+        window_ids: int64 window id of every row
+        values: Values of one series; NaN values are ignored
+
+    Returns:
+        Dictionary of window id -> QuantileSketch for windows with values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    window_ids, values = np.asarray(window_ids)[valid], values[valid]
+    if len(values) == 0:
+        return {}
+
+    signs = np.sign(values).astype(np.int64)
+    keys = np.zeros(len(values), dtype=np.int64)
+    nonzero = signs != 0
+    keys[nonzero] = QuantileSketch(relative_accuracy).bucket_keys(np.abs(values[nonzero]))
+
+    # Collapse rows into (window, sign, key) buckets
+    order = np.lexsort((keys, signs, window_ids))
+    window_ids, signs, keys, values = window_ids[order], signs[order], keys[order], values[order]
+    starts = np.flatnonzero(np.r_[True, (np.diff(window_ids) != 0) | (np.diff(signs) != 0) | (np.diff(keys) != 0)])
+    counts = np.diff(np.r_[starts, len(values)])
+
+    window_starts = np.flatnonzero(np.r_[True, np.diff(window_ids) != 0])
+    windows = window_ids[window_starts].tolist()
+    minimums = dict(zip(windows, np.minimum.reduceat(values, window_starts).tolist()))
+    maximums = dict(zip(windows, np.maximum.reduceat(values, window_starts).tolist()))
+
+    return sketches_from_buckets(
+        window_ids[starts], signs[starts], keys[starts], counts, minimums, maximums, relative_accuracy
+    )
+
+
+def add_quantile_columns(df, column, sketches, window_minutes=10):
+    """
+    Add `{column}_{p}` quantile columns and a `{column}_sketch` blob column
+    to an aggregated frame
+
+    Args:
+        df: Aggregated frame with one row per window
+        column: Series the sketches describe
+        sketches: Window id -> QuantileSketch; windows without one get NaN
+            quantiles and the blob of an empty sketch
+        window_minutes: Window length in minutes
+
+    Returns:
+        The frame with the new columns
+    """
+    window_ns = int(window_minutes) * 60 * 10**9
+    window_ids = (np.asarray(df["timestamp"], dtype="datetime64[ns]").astype(np.int64) // window_ns).tolist()
+    window_sketch = [sketches.get(window_id) for window_id in window_ids]
+
+    for name, q in QUANTILES.items():
+        df[f"{column}_{name}"] = np.array(
+            [sketch.quantile(q) if sketch else np.nan for sketch in window_sketch], dtype=np.float64
+        )
+    empty = QuantileSketch().to_bytes()
+    df[f"{column}_sketch"] = pd.Series(
+        [sketch.to_bytes() if sketch else empty for sketch in window_sketch], index=df.index, dtype=object
+    )
+    return df
+
+
+def add_window_quantiles(result, df, columns, window_minutes=10):
+    """
+    Sketch every column of raw rows per window and add the quantile and blob
+    columns to the matching aggregated frame
+
+    Args:
+        result: Frame from `aggregate_windows` over `df`
+        df: Raw rows with `timestamp` and the value columns
+        columns: Columns to sketch
+        window_minutes: Window length in minutes
+
+    Returns:
+        The aggregated frame with the new columns
+    """
+    if result.empty:
+        return result
+
+    window_ns = int(window_minutes) * 60 * 10**9
+    window_ids = np.asarray(df["timestamp"], dtype="datetime64[ns]").astype(np.int64) // window_ns
+    for col in columns:
+        add_quantile_columns(result, col, window_sketches(window_ids, df[col].to_numpy()), window_minutes)
+    return result
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregation import StreamingAggregator, _merge_partials, aggregate_windows, window_partials
+
+
+def frame(periods=600, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=periods, freq="min"),
+        "wind_speed": rng.normal(8, 2, periods),
+        "power": rng.normal(1500, 300, periods),
+    })
+    df.loc[df.index % 17 == 0, "power"] = np.nan
+    return df
+
+
+def test_matches_resample():
+    # A gap of empty windows in the middle
+    df = frame().drop(index=range(200, 260)).reset_index(drop=True)
+    columns = ["wind_speed", "power"]
+
+    result = aggregate_windows(df, columns)
+    expected = df.set_index("timestamp")[columns].resample("10min").agg(["mean", "min", "max", "std"])
+    expected.columns = [f"{col}_{stat}" for col, stat in expected.columns]
+
+    assert list(result.columns) == ["timestamp"] + list(expected.columns)
+    np.testing.assert_array_equal(result["timestamp"], expected.index)
+    np.testing.assert_allclose(result[expected.columns], expected, rtol=1e-9)
+
+
+def test_statistics_selection():
+    df = frame(periods=20)
+    result = aggregate_windows(df, ["wind_speed"], stats=("count", "mean"))
+
+    assert list(result.columns) == ["timestamp", "wind_speed_count", "wind_speed_mean"]
+    assert result["wind_speed_count"].tolist() == [10, 10]
+    assert result["wind_speed_mean"].iloc[0] == pytest.approx(df["wind_speed"].iloc[:10].mean())
+
+    with pytest.raises(ValueError):
+        aggregate_windows(df, ["wind_speed"], stats=("median",))
+
+
+def test_empty_frame():
+    result = aggregate_windows(pd.DataFrame(), ["power"])
+    assert result.empty
+    assert list(result.columns) == ["timestamp", "power_mean", "power_min", "power_max", "power_std"]
+
+
+def test_chan_merge_matches_single_pass():
+    values = np.random.default_rng(3).normal(size=(100, 2))
+    values[::7, 1] = np.nan
+    buckets = np.zeros(100, dtype=np.int64)
+
+    def partial(rows):
+        _, counts, means, m2, mins, maxs = window_partials(buckets[rows], values[rows])
+        return np.stack([counts[0], means[0], m2[0], mins[0], maxs[0]])
+
+    merged = _merge_partials(partial(slice(0, 30)), partial(slice(30, 100)))
+    np.testing.assert_allclose(merged, partial(slice(0, 100)))
+
+
+def test_chan_merge_with_empty_partial():
+    empty = np.array([[0.0], [np.nan], [0.0], [np.nan], [np.nan]])
+    state = np.array([[4.0], [2.5], [5.0], [1.0], [4.0]])
+
+    np.testing.assert_allclose(_merge_partials(empty, state), state)
+    np.testing.assert_allclose(_merge_partials(state, empty), state)
+
+
+def test_streaming_batches_match_batch_aggregation():
+    df = frame()
+    columns = ["wind_speed", "power"]
+    aggregator = StreamingAggregator(columns)
+
+    # Out of order batches that split windows between them
+    for rows in (slice(300, 600), slice(0, 155), slice(155, 300)):
+        aggregator.add(df.iloc[rows])
+    aggregator.advance_watermark(df["timestamp"].iloc[-1] + pd.Timedelta(minutes=10))
+
+    streamed = aggregator.emit_closed()
+    expected = aggregate_windows(df, columns)
+    assert aggregator.open_windows == 0
+    pd.testing.assert_frame_equal(streamed, expected, check_exact=False, rtol=1e-9)
+
+
+def test_late_rows_are_dropped():
+    df = frame(periods=60)
+    aggregator = StreamingAggregator(["power"])
+    aggregator.add(df.iloc[30:])
+    emitted = aggregator.emit_closed()
+
+    assert aggregator.add(df.iloc[:10]) == 0
+    assert aggregator.late_rows == 10
+    assert len(emitted) == 2  # 00:50 is still open at a watermark of 00:59
+    assert emitted["power_mean"].iloc[0] == pytest.approx(df["power"].iloc[30:40].mean())
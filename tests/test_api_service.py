@@ -0,0 +1,117 @@
+"""
+Tests of the FastAPI service in api/
+"""
+import importlib
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+from conftest import ROOT
+
+API_DIR = os.path.join(ROOT, "api")
+
+# Module names api/ shares with the Flask app
+API_MODULES = ("main", "database", "models")
+
+START = datetime(2024, 5, 1)
+DATA_URL = "/data?start_date=2024-05-01T00:00:00&end_date=2024-05-02T00:00:00"
+
+
+@pytest.fixture(scope="module")
+def api():
+    """
+    api/main.py and its database and models modules, imported without
+    replacing the Flask modules of the same names
+    """
+    os.environ.setdefault("ASYNC_DATABASE_URL", os.environ["DATABASE_URL"].replace("sqlite://", "sqlite+aiosqlite://", 1))
+
+    saved = {name: sys.modules.pop(name) for name in API_MODULES if name in sys.modules}
+    sys.path.insert(0, API_DIR)
+    try:
+        importlib.import_module("main")
+    finally:
+        sys.path.remove(API_DIR)
+        modules = {name: sys.modules.pop(name) for name in API_MODULES if name in sys.modules}
+        sys.modules.update(saved)
+
+    api = SimpleNamespace(**modules)
+    api.database.Base.metadata.create_all(api.database.engine)
+    return api
+
+
+@pytest.fixture
+def client(api):
+    Data = api.models.Data
+    with api.database.SessionLocal() as session:
+        session.query(Data).delete()
+        session.add_all(
+            Data(timestamp=START + timedelta(minutes=i), wind_speed=float(i), power=2.0 * i, ambient_temperature=20.0)
+            for i in range(2500)
+        )
+        session.commit()
+
+    with TestClient(api.main.app) as client:
+        yield client
+
+
+def test_json_streams_every_row(client):
+    response = client.get(DATA_URL + "&columns=power")
+    body = response.json()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert body["count"] == 1441
+    assert len(body["data"]) == 1441
+    assert body["data"][0] == {"timestamp": "2024-05-01T00:00:00", "power": 0.0}
+    assert body["data"][-1] == {"timestamp": "2024-05-02T00:00:00", "power": 2880.0}
+    assert body["start_date"] == "2024-05-01T00:00:00"
+
+
+def test_json_empty_range(client):
+    response = client.get("/data?start_date=2023-01-01T00:00:00&end_date=2023-01-02T00:00:00")
+
+    assert response.status_code == 200
+    assert response.json() == {"data": [], "count": 0, "message": "No data found for the specified time range"}
+
+
+def test_ndjson_streams_one_row_per_line(client):
+    response = client.get(DATA_URL + "&format=ndjson&columns=wind_speed")
+    lines = response.text.splitlines()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert len(lines) == 1441
+    assert json.loads(lines[1]) == {"timestamp": "2024-05-01T00:01:00", "wind_speed": 1.0}
+
+
+def test_async_pool_sizing(api):
+    pool = api.database.async_engine.pool
+
+    assert pool.size() == api.database.DB_POOL_SIZE
+    assert pool.timeout() == api.database.DB_POOL_TIMEOUT
+    assert pool._max_overflow == api.database.DB_MAX_OVERFLOW
+
+
+@pytest.mark.parametrize("query,detail", [
+    ("&format=csv", "Invalid format"),
+    ("&columns=power,voltage", "Invalid column"),
+])
+def test_invalid_arguments(client, query, detail):
+    response = client.get(DATA_URL + query)
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith(detail)
+
+
+def test_reversed_range(client):
+    response = client.get("/data?start_date=2024-05-02T00:00:00&end_date=2024-05-01T00:00:00")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "start_date must be before end_date"
@@ -0,0 +1,98 @@
+from datetime import datetime
+
+import main
+from cache import ResultCache, signal_cache
+from conftest import SIGNALS_URL, set_signal_value
+
+DAY_1 = (datetime(2024, 1, 1), datetime(2024, 1, 2))
+DAY_2 = (datetime(2024, 1, 2, 12), datetime(2024, 1, 3))
+
+
+def test_lru_eviction_by_size():
+    cache = ResultCache(max_bytes=10, ttl=60)
+    cache.set("a", "A", *DAY_1, size=4)
+    cache.set("b", "B", *DAY_1, size=4)
+    assert cache.get("a") == "A"
+
+    # "b" is now the least recently used entry
+    cache.set("c", "C", *DAY_1, size=4)
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size_bytes"] == 8
+
+
+def test_oversized_value_is_not_cached():
+    cache = ResultCache(max_bytes=10, ttl=60)
+    cache.set("a", "A", *DAY_1, size=11)
+    assert cache.get("a") is None
+
+
+def test_expired_entry_is_a_miss(monkeypatch):
+    cache = ResultCache(max_bytes=10, ttl=60)
+    now = 1000.0
+    monkeypatch.setattr("cache.time.monotonic", lambda: now)
+    cache.set("a", "A", *DAY_1, size=1)
+
+    now += 61
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_invalidate_range_drops_overlapping_entries():
+    cache = ResultCache(max_bytes=10, ttl=60)
+    cache.set("day 1", 1, *DAY_1, size=1)
+    cache.set("day 2", 2, *DAY_2, size=1)
+
+    assert cache.invalidate_range(datetime(2024, 1, 2, 18), datetime(2024, 1, 2, 19)) == 1
+    assert cache.get("day 2") is None
+    assert cache.get("day 1") == 1
+
+
+def test_repeated_request_hits_cache(signal_client):
+    first = signal_client.get(SIGNALS_URL)
+    hits = signal_cache.hits
+    second = signal_client.get(SIGNALS_URL)
+
+    assert first.status_code == second.status_code == 200
+    assert second.get_data() == first.get_data()
+    assert signal_cache.hits == hits + 1
+
+
+def test_write_in_range_bypasses_cache(signal_client):
+    first = signal_client.get(SIGNALS_URL)
+
+    # Written behind the cache's back: no invalidation is sent
+    set_signal_value(1, 1000.0)
+    hits = signal_cache.hits
+    second = signal_client.get(SIGNALS_URL)
+
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert second.get_json()["data"][0]["value"] == 1000.0
+    assert signal_cache.hits == hits
+
+
+def test_invalidate_endpoint(signal_client, monkeypatch):
+    monkeypatch.setattr(main, "CACHE_INVALIDATE_TOKEN", "secret")
+    signal_client.get(SIGNALS_URL)
+    body = {"start_date": "2024-03-01T00:00:00", "end_date": "2024-03-02T00:00:00"}
+    headers = {"X-Cache-Token": "secret"}
+
+    response = signal_client.post("/api/cache/invalidate", json=body, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()["invalidated"] == 1
+    assert signal_cache.stats()["entries"] == 0
+    assert signal_client.post("/api/cache/invalidate", json={}, headers=headers).status_code == 400
+
+
+def test_invalidate_requires_token(signal_client, monkeypatch):
+    url = "/api/cache/invalidate"
+    body = {"start_date": "2024-03-01T00:00:00", "end_date": "2024-03-02T00:00:00"}
+
+    # Refused while no token is configured, whatever the client sends
+    monkeypatch.setattr(main, "CACHE_INVALIDATE_TOKEN", "")
+    assert signal_client.post(url, json=body, headers={"X-Cache-Token": ""}).status_code == 403
+
+    monkeypatch.setattr(main, "CACHE_INVALIDATE_TOKEN", "secret")
+    assert signal_client.post(url, json=body).status_code == 403
+    assert signal_client.post(url, json=body, headers={"X-Cache-Token": "wrong"}).status_code == 403
@@ -0,0 +1,69 @@
+import main
+from conftest import SIGNALS_URL, set_signal_value
+
+
+def test_matching_etag_is_not_modified(signal_client):
+    first = signal_client.get(SIGNALS_URL)
+    response = signal_client.get(SIGNALS_URL, headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == 200
+    assert response.status_code == 304
+    assert response.headers["ETag"] == first.headers["ETag"]
+    assert not response.get_data()
+
+
+def test_historical_range_is_cacheable(signal_client):
+    response = signal_client.get(SIGNALS_URL)
+
+    assert response.headers["Cache-Control"] == f"public, max-age={main.HISTORICAL_CACHE_MAX_AGE}"
+    assert "Accept" in response.headers["Vary"]
+
+
+def test_write_in_range_changes_etag(signal_client):
+    etag = signal_client.get(SIGNALS_URL).headers["ETag"]
+    set_signal_value(1, 1000.0)
+
+    response = signal_client.get(SIGNALS_URL, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_representations_do_not_share_etag(signal_client):
+    json_etag = signal_client.get(SIGNALS_URL).headers["ETag"]
+    arrow_etag = signal_client.get(SIGNALS_URL, headers={"Accept": main.ARROW_MIMETYPE}).headers["ETag"]
+
+    assert json_etag != arrow_etag
+
+
+def test_last_modified_answers_if_modified_since(signal_client):
+    first = signal_client.get(SIGNALS_URL)
+    last_modified = first.headers["Last-Modified"]
+
+    response = signal_client.get(SIGNALS_URL, headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    older = signal_client.get(SIGNALS_URL, headers={"If-Modified-Since": "Fri, 01 Mar 2024 04:00:00 GMT"})
+    assert older.status_code == 200
+
+
+def test_if_none_match_takes_precedence(signal_client):
+    first = signal_client.get(SIGNALS_URL)
+    set_signal_value(1, 1000.0)
+
+    # The rewrite does not move Last-Modified, but the stale ETag still misses
+    response = signal_client.get(SIGNALS_URL, headers={
+        "If-None-Match": first.headers["ETag"],
+        "If-Modified-Since": first.headers["Last-Modified"],
+    })
+    assert response.status_code == 200
+
+
+def test_page_validator_ignores_rows_after_the_page(signal_client):
+    url = SIGNALS_URL + "&limit=10"
+    etag = signal_client.get(url).headers["ETag"]
+    set_signal_value(30, 1000.0)
+    assert signal_client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    # The row after the page decides the next cursor, so it is covered
+    set_signal_value(11, 1000.0)
+    assert signal_client.get(url, headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete
+
+import main
+from extensions import db
+from models import Data
+
+START = datetime(2024, 2, 1)
+
+
+@pytest.fixture
+def client():
+    # Pairs of rows share a timestamp, so pages must break ties on id
+    with main.app.app_context():
+        db.session.execute(delete(Data))
+        db.session.add_all(
+            Data(timestamp=START + timedelta(minutes=i // 2), wind_speed=float(i), power=float(i), ambient_temperature=20.0)
+            for i in range(95)
+        )
+        db.session.commit()
+    yield main.app.test_client()
+
+
+@pytest.mark.parametrize("timestamp,row_id", [
+    (datetime(2024, 3, 1, 12, 30), 1),
+    (datetime(2024, 3, 1, 12, 30, 0, 123456), 2**40),
+])
+def test_cursor_round_trip(timestamp, row_id):
+    cursor = main.encode_cursor(timestamp, row_id)
+
+    assert "=" not in cursor
+    assert main.decode_cursor(cursor) == (timestamp, row_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", main.encode_cursor(datetime(2024, 1, 1), 1)[:-3]])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        main.decode_cursor(cursor)
+
+
+def test_pages_cover_range_once(client):
+    url = "/api/data?start_date=2024-02-01T00:00:00&end_date=2024-02-02T00:00:00&limit=10"
+    seen, cursor, pages = [], None, 0
+
+    while True:
+        body = client.get(url + (f"&cursor={cursor}" if cursor else "")).get_json()
+        seen.extend(row["wind_speed"] for row in body["data"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert pages == 10
+    assert seen == [float(i) for i in range(95)]
+
+
+def test_invalid_page_arguments(client):
+    url = "/api/data?start_date=2024-02-01T00:00:00&end_date=2024-02-02T00:00:00"
+
+    assert client.get(url + "&limit=0").status_code == 400
+    assert client.get(url + "&cursor=bogus").status_code == 400
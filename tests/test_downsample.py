@@ -0,0 +1,59 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from downsample import downsample_rows, lttb_indices, minmax_indices
+
+Row = namedtuple("Row", ["timestamp", "wind_speed", "power", "ambient_temperature"])
+
+
+def series(n, k=3, seed=4):
+    return np.random.default_rng(seed).normal(size=(k, n))
+
+
+@pytest.mark.parametrize("n_out", [1, 2, 3, 7, 50, 999])
+def test_lttb_size(n_out):
+    ys = series(1000)
+    indices = lttb_indices(np.arange(1000, dtype=np.float64), ys, n_out)
+
+    assert len(indices) == n_out
+    assert indices[0] == 0
+    assert indices[-1] == 999 or n_out == 1
+    assert np.all(np.diff(indices) > 0)
+
+
+@pytest.mark.parametrize("n_series", [1, 2, 3])
+@pytest.mark.parametrize("n_out", [*range(1, 30), 40, 100, 500])
+def test_minmax_within_max_points(n_series, n_out):
+    indices = minmax_indices(series(1000, n_series), n_out)
+
+    assert 0 < len(indices) <= n_out
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_minmax_keeps_extremes():
+    ys = series(1000, 1)
+    indices = minmax_indices(ys, 100)
+
+    assert {0, 999, int(ys[0].argmin()), int(ys[0].argmax())} <= set(indices.tolist())
+
+
+def test_input_under_max_points_is_unchanged():
+    ys = series(10)
+    assert list(minmax_indices(ys, 10)) == list(range(10))
+    assert list(lttb_indices(np.arange(10.0), ys, 20)) == list(range(10))
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_rows(method):
+    start = datetime(2024, 1, 1)
+    values = series(500)
+    rows = [Row(start + timedelta(minutes=i), *values[:, i]) for i in range(500)]
+
+    selected = downsample_rows(rows, ["wind_speed", "power", "ambient_temperature"], 40, method)
+
+    assert 0 < len(selected) <= 40
+    assert selected[0] is rows[0] and selected[-1] is rows[-1]
+    assert [row.timestamp for row in selected] == sorted(row.timestamp for row in selected)
@@ -0,0 +1,55 @@
+from sqlalchemy import create_engine, text
+
+from migrations import (
+    DEFAULT_SIGNAL_TYPES,
+    SOURCE_ACCESS_PATTERNS,
+    SOURCE_MIGRATIONS,
+    TARGET_ACCESS_PATTERNS,
+    TARGET_MIGRATIONS,
+    check_plans,
+    migrate,
+)
+
+
+def assert_plans_use_indexes(engine, patterns):
+    results = check_plans(engine, patterns)
+    assert results
+    for name, index, used, plan in results:
+        assert used, f"{name} does not use {index}:\n" + "\n".join(plan)
+
+
+def test_sqlite_plans_use_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+
+    assert migrate(engine) == [migration.version for migration in sorted(TARGET_MIGRATIONS)]
+    assert migrate(engine) == []
+    assert_plans_use_indexes(engine, TARGET_ACCESS_PATTERNS)
+
+
+def test_default_signal_types_are_seeded_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    migrate(engine, [migration for migration in TARGET_MIGRATIONS if migration.version < 5])
+
+    # Seeded at startup before the migration existed
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO signal_type (id, name) VALUES (1, 'wind_speed_avg')"))
+    migrate(engine)
+
+    with engine.connect() as connection:
+        rows = connection.execute(text("SELECT id, name FROM signal_type ORDER BY id")).all()
+    assert [tuple(row) for row in rows] == DEFAULT_SIGNAL_TYPES
+
+
+def test_postgres_target_plans_use_indexes(postgres_engine):
+    engine = postgres_engine()
+
+    assert migrate(engine) == [migration.version for migration in sorted(TARGET_MIGRATIONS)]
+    assert migrate(engine) == []
+    assert_plans_use_indexes(engine, TARGET_ACCESS_PATTERNS)
+
+
+def test_postgres_source_plans_use_indexes(postgres_engine):
+    engine = postgres_engine()
+
+    assert migrate(engine, SOURCE_MIGRATIONS) == [migration.version for migration in sorted(SOURCE_MIGRATIONS)]
+    assert_plans_use_indexes(engine, SOURCE_ACCESS_PATTERNS)
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+import partitions
+from migrations import migrate
+from partitions import maintain_partitions, monthly_partitions, relation_kind
+
+NOW = datetime(2020, 3, 15)
+
+
+def expire_data(engine, mode, monkeypatch):
+    """
+    Rows of January and February 2020 in the default partition of data,
+    maintained in March with one month of retention
+    """
+    migrate(engine)
+    monkeypatch.setattr(partitions, "PARTITIONED_TABLES", {"data": 1})
+
+    with engine.begin() as connection:
+        connection.execute(text("""
+            INSERT INTO data (timestamp, wind_speed, power, ambient_temperature)
+            SELECT timestamp '2020-01-01' + g * interval '1 day', g, g, 20 FROM generate_series(0, 44) g
+        """))
+        return maintain_partitions(connection.connection.cursor(), now=NOW, premake=0, mode=mode)["data"]
+
+
+def count(connection, table):
+    return connection.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+
+
+def test_detach_moves_expired_default_rows_into_detached_tables(postgres_engine, monkeypatch):
+    engine = postgres_engine()
+    summary = expire_data(engine, "detach", monkeypatch)
+
+    assert summary["expired"] == ["data_2020_01"]
+    with engine.connect() as connection:
+        cursor = connection.connection.cursor()
+        assert relation_kind(cursor, "data_2020_01") == "r"
+        assert datetime(2020, 1, 1) not in monthly_partitions(cursor, "data")
+        assert count(connection, "data_2020_01") == 31
+        assert count(connection, "data_default") == 0
+        assert count(connection, "data") == 14
+
+
+def test_drop_deletes_expired_default_rows(postgres_engine, monkeypatch):
+    engine = postgres_engine()
+    summary = expire_data(engine, "drop", monkeypatch)
+
+    assert summary["expired"] == []
+    with engine.connect() as connection:
+        assert relation_kind(connection.connection.cursor(), "data_2020_01") is None
+        assert count(connection, "data_default") == 0
+        assert count(connection, "data") == 14
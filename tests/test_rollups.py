@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from aggregation import WINDOW_STATS, aggregate_windows
+from migrations import migrate
+from rollups import store_partials, store_sketches
+from sketches import add_window_quantiles
+
+START = datetime(2024, 7, 1)
+
+
+def windows_frame(minutes):
+    rows = pd.DataFrame({
+        "timestamp": [START + timedelta(minutes=m) for m in minutes],
+        "power": np.arange(len(minutes), dtype=float),
+    })
+    frame = aggregate_windows(rows, ["power"], window_minutes=10, stats=WINDOW_STATS)
+    return add_window_quantiles(frame, rows, ["power"], window_minutes=10).fillna(0)
+
+
+def load(engine, frame):
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        store_partials(cursor, frame, ["power"])
+        store_sketches(cursor, frame, ["power"])
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def stored(engine, query):
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(query)
+        return cursor.fetchall()
+    finally:
+        connection.close()
+
+
+def test_reload_that_empties_a_window(postgres_engine):
+    engine = postgres_engine()
+    migrate(engine)
+
+    load(engine, windows_frame(range(60)))
+    # The window at 00:20 lost all its rows in the source
+    load(engine, windows_frame([m for m in range(60) if not 20 <= m < 30]))
+
+    partials = stored(engine, "SELECT timestamp, count FROM signal_partial_10m ORDER BY timestamp")
+    assert [timestamp.minute for timestamp, _ in partials] == [0, 10, 30, 40, 50]
+    assert stored(engine, "SELECT timestamp, count FROM signal_rollup_1h") == [(START, 50)]
+    assert stored(engine, "SELECT count FROM signal_rollup_1d") == [(50,)]
+
+    sketches = stored(engine, "SELECT bucket, count(*) FROM signal_sketch GROUP BY bucket ORDER BY bucket")
+    assert sketches == [("10m", 5), ("1d", 1), ("1h", 1)]
+
+
+def test_reload_that_empties_an_hour(postgres_engine):
+    engine = postgres_engine()
+    migrate(engine)
+
+    load(engine, windows_frame(range(180)))
+    load(engine, windows_frame([m for m in range(180) if not 60 <= m < 120]))
+
+    hours = stored(engine, "SELECT timestamp, count FROM signal_rollup_1h ORDER BY timestamp")
+    assert hours == [(START, 60), (START + timedelta(hours=2), 60)]
+    assert stored(engine, "SELECT count(*) FROM signal_sketch WHERE bucket = '1h'") == [(2,)]
+
+
+def test_partials_and_sketches_round_trip_through_copy(postgres_engine):
+    engine = postgres_engine()
+    migrate(engine)
+
+    frame = windows_frame(range(30))
+    frame["power_sum"] += 0.1
+    load(engine, frame)
+
+    partials = stored(engine, "SELECT count, sum, sumsq, min, max FROM signal_partial_10m ORDER BY timestamp")
+    expected = frame[["power_count", "power_sum", "power_sumsq", "power_min", "power_max"]]
+    assert partials == [tuple(row) for row in expected.itertuples(index=False)]
+
+    sketches = stored(engine, "SELECT sketch FROM signal_sketch WHERE bucket = '10m' ORDER BY timestamp")
+    assert [bytes(sketch) for (sketch,) in sketches] == list(frame["power_sketch"])
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from sketches import QuantileSketch, RELATIVE_ACCURACY, window_sketches
+
+
+def sketch_of(values):
+    sketch = QuantileSketch()
+    sketch.add(values)
+    return sketch
+
+
+def test_quantiles_within_relative_accuracy():
+    values = np.random.default_rng(1).lognormal(size=10000)
+    sketch = sketch_of(values)
+
+    for q in (0.05, 0.5, 0.95):
+        exact = np.quantile(values, q, method="lower")
+        assert sketch.quantile(q) == pytest.approx(exact, rel=2 * RELATIVE_ACCURACY)
+
+
+def test_merge_matches_single_sketch():
+    values = np.random.default_rng(2).normal(size=5000)
+    merged = sketch_of(values[:2000]).merge(sketch_of(values[2000:]))
+    whole = sketch_of(values)
+
+    assert merged.count == whole.count == len(values)
+    assert merged.positive == whole.positive
+    assert merged.negative == whole.negative
+    assert (merged.min, merged.max) == (whole.min, whole.max)
+
+
+def test_merge_rejects_different_accuracy():
+    with pytest.raises(ValueError):
+        QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+def test_serialization_round_trip():
+    sketch = sketch_of([-3.5, -0.1, 0.0, 0.0, 1.0, 2.5, 1000.0, np.nan])
+    restored = QuantileSketch.from_bytes(sketch.to_bytes())
+
+    assert restored.relative_accuracy == sketch.relative_accuracy
+    assert restored.zero_count == 2
+    assert restored.positive == sketch.positive
+    assert restored.negative == sketch.negative
+    assert (restored.min, restored.max) == (-3.5, 1000.0)
+    for q in (0.0, 0.25, 0.5, 0.75, 1.0):
+        assert restored.quantile(q) == sketch.quantile(q)
+
+
+def test_empty_sketch_round_trip():
+    restored = QuantileSketch.from_bytes(QuantileSketch().to_bytes())
+    assert restored.count == 0
+    assert restored.quantile(0.5) is None
+
+
+def test_window_sketches_split_by_window():
+    values = np.arange(20, dtype=np.float64)
+    values[3] = np.nan
+    sketches = window_sketches(np.repeat([7, 8], 10), values)
+
+    assert sorted(sketches) == [7, 8]
+    assert sketches[7].count == 9 and sketches[8].count == 10
+    assert (sketches[8].min, sketches[8].max) == (10.0, 19.0)
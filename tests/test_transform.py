@@ -0,0 +1,116 @@
+"""
+Tests of the ETL transform in etl/
+"""
+import io
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from aggregation import StreamingAggregator
+from migrations import SOURCE_MIGRATIONS, migrate
+from conftest import ROOT
+
+sys.path.append(os.path.join(ROOT, "etl"))
+import transform
+
+START = datetime(2024, 6, 1)
+
+
+def minute_rows(first, last):
+    minutes = range(first, last + 1)
+    return pd.DataFrame({
+        "timestamp": [START + timedelta(minutes=m) for m in minutes],
+        "power": [float(m) for m in minutes],
+    })
+
+
+def test_failed_save_is_retried_without_losing_windows(monkeypatch):
+    source = minute_rows(0, 19)
+    monkeypatch.setattr(
+        transform, "fetch_data_from_api",
+        lambda start, end, columns: source[(source["timestamp"] >= start) & (source["timestamp"] <= end)]
+    )
+
+    saved = []
+    failures = iter([True])
+
+    def save_to_target_db(frame):
+        if next(failures, False):
+            raise RuntimeError("target database unavailable")
+        saved.extend(frame[["timestamp", "power_count"]].itertuples(index=False))
+        return len(frame)
+
+    monkeypatch.setattr(transform, "save_to_target_db", save_to_target_db)
+    aggregator = StreamingAggregator(["power"], quantiles=True)
+
+    # The first window closes, the second is still open when the save fails
+    end = START + timedelta(minutes=14, seconds=59)
+    with pytest.raises(RuntimeError):
+        transform.process_increment(aggregator, START, end)
+
+    transform.process_increment(aggregator, START, end)
+    transform.process_increment(aggregator, end + timedelta(microseconds=1), START + timedelta(minutes=20))
+
+    assert saved == [(pd.Timestamp(START), 10), (pd.Timestamp(START + timedelta(minutes=10)), 10)]
+    assert aggregator.late_rows == 0
+
+
+def test_pushdown_matches_aggregate_data(postgres_engine, monkeypatch):
+    engine = postgres_engine()
+    migrate(engine, SOURCE_MIGRATIONS)
+
+    # Two hours of rows with an empty window and a negative and a zero value
+    minutes = [m for m in range(120) if not 30 <= m < 40]
+    rng = np.random.default_rng(7)
+    rows = pd.DataFrame({
+        "timestamp": [START + timedelta(minutes=m, seconds=17) for m in minutes],
+        "wind_speed": rng.gamma(4.0, 2.0, len(minutes)),
+        "power": rng.normal(1500.0, 400.0, len(minutes)),
+        "ambient_temperature": 20.0,
+    })
+    rows.loc[3, "power"] = -12.5
+    rows.loc[4, "power"] = 0.0
+    rows.to_sql("data", engine, if_exists="append", index=False)
+    monkeypatch.setattr(transform, "_source_engine", engine)
+
+    end = START + timedelta(hours=2)
+    pushed_down, processed = transform.fetch_aggregated_from_db(START, end)
+    expected = transform.aggregate_data(rows)
+
+    assert processed == len(rows)
+    pd.testing.assert_frame_equal(pushed_down, expected, check_dtype=False, rtol=1e-9)
+
+
+def arrow_stream(batches):
+    table = pa.table({"timestamp": [START + timedelta(minutes=m) for m in range(6)], "power": [float(m) for m in range(6)]})
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=6 // batches):
+            writer.write_batch(batch)
+    return table, sink.getvalue()
+
+
+def test_arrow_decoder_reads_a_stream_fed_byte_by_byte():
+    table, body = arrow_stream(batches=3)
+    decoder = transform.ArrowStreamDecoder()
+    for i in range(len(body)):
+        decoder.feed(body[i:i + 1])
+
+    assert decoder.finished
+    pd.testing.assert_frame_equal(decoder.frame(), table.to_pandas())
+
+
+def test_arrow_decoder_rejects_a_stream_cut_after_a_batch():
+    _, body = arrow_stream(batches=2)
+    decoder = transform.ArrowStreamDecoder()
+    # Drop the end-of-stream marker: every message left is complete
+    decoder.feed(body[:-8])
+
+    assert len(decoder.batches) == 2
+    with pytest.raises(ValueError, match="Truncated Arrow IPC stream"):
+        decoder.frame()